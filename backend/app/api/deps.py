@@ -0,0 +1,69 @@
+"""
+LIFELINE AI - API Dependencies
+Shared service instances injected into endpoints
+"""
+
+from functools import lru_cache
+
+from app.services.ai.emergency_classifier import EmergencyClassifier
+from app.services.ai.severity_scorer import SeverityScorer
+from app.services.ai.first_aid_generator import FirstAidGenerator
+from app.services.ai.image_processor import ImageProcessor
+from app.services.ai.voice_processor import VoiceProcessor
+from app.services.ai.openai_client import close_openai_client
+from app.services.location.base import BaseHospitalFinder
+from app.services.location.hospital_finder_racing import RacingHospitalFinder
+from app.services.location.http_session import close_http_session
+
+
+@lru_cache()
+def get_classifier() -> EmergencyClassifier:
+    """Shared emergency classifier (loads custom models once)"""
+    return EmergencyClassifier()
+
+
+@lru_cache()
+def get_severity_scorer() -> SeverityScorer:
+    """Shared severity scorer"""
+    return SeverityScorer()
+
+
+@lru_cache()
+def get_first_aid_generator() -> FirstAidGenerator:
+    """Shared first aid instruction generator"""
+    return FirstAidGenerator()
+
+
+@lru_cache()
+def get_hospital_finder() -> BaseHospitalFinder:
+    """Shared hospital finder (OSM, raced against Google Places when configured)"""
+    return RacingHospitalFinder()
+
+
+@lru_cache()
+def get_image_processor() -> ImageProcessor:
+    """Shared image processor"""
+    return ImageProcessor()
+
+
+@lru_cache()
+def get_voice_processor() -> VoiceProcessor:
+    """Shared voice processor"""
+    return VoiceProcessor()
+
+
+def init_services():
+    """Create every shared service so the first request doesn't pay for it"""
+    get_classifier().custom_classifier.warm_up()
+    get_severity_scorer()
+    get_first_aid_generator()
+    get_hospital_finder()
+    get_image_processor()
+    get_voice_processor()
+
+
+async def close_services():
+    """Persist caches and release network clients held by the shared services"""
+    get_classifier().save_semantic_cache()
+    await close_openai_client()
+    await close_http_session()
@@ -2,9 +2,13 @@
 LIFELINE AI - Emergency Detection Endpoint
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Annotated, AsyncIterator, Dict, Any, List, Optional, Tuple
+import orjson
 from datetime import datetime
+import asyncio
+import logging
 
 from app.models.schemas import (
     EmergencyRequest,
@@ -13,89 +17,321 @@ from app.models.schemas import (
     FirstAidRequest,
     FirstAidInstruction,
     EmergencyDetection,
+    Hospital,
+    LocationData,
 )
 from app.services.ai.emergency_classifier import EmergencyClassifier
 from app.services.ai.severity_scorer import SeverityScorer
 from app.services.ai.first_aid_generator import FirstAidGenerator
-from app.services.location.hospital_finder import HospitalFinder
+from app.services.location.base import BaseHospitalFinder
+from app.api.deps import (
+    get_classifier,
+    get_severity_scorer,
+    get_first_aid_generator,
+    get_hospital_finder,
+)
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Health probes are polled constantly, so the body is serialized once
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "emergency"})
+
+# Pending (input_type, content) classifications and the futures awaiting them
+_classification_queue: Optional[asyncio.Queue] = None
+_classification_worker: Optional[asyncio.Task] = None
+
+
+async def _run_classification_batches(classifier: EmergencyClassifier):
+    """Drain queued classifications into batches and resolve their futures"""
+    loop = asyncio.get_running_loop()
+    max_latency = settings.BATCH_MAX_LATENCY_MS / 1000
+    
+    while True:
+        batch: List[Tuple[Tuple[str, str], asyncio.Future]] = [await _classification_queue.get()]
+        deadline = loop.time() + max_latency
+        
+        # Collect more items until the batch is full or the latency budget is spent
+        while len(batch) < settings.BATCH_MAX_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_classification_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        # Skip callers that went away while waiting
+        batch = [(payload, future) for payload, future in batch if not future.done()]
+        if not batch:
+            continue
+        
+        try:
+            results = await classifier.classify_batch(
+                input_types=[payload[0] for payload, _ in batch],
+                contents=[payload[1] for payload, _ in batch]
+            )
+        except Exception as e:
+            logger.error("Batched classification error: %s", e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def start_classification_batching(classifier: EmergencyClassifier):
+    """Start the background micro-batching worker (called from app lifespan)"""
+    global _classification_queue, _classification_worker
+    _classification_queue = asyncio.Queue()
+    _classification_worker = asyncio.create_task(_run_classification_batches(classifier))
+
+
+async def stop_classification_batching():
+    """Stop the background micro-batching worker"""
+    global _classification_queue, _classification_worker
+    if _classification_worker is not None:
+        _classification_worker.cancel()
+        try:
+            await _classification_worker
+        except asyncio.CancelledError:
+            pass
+    _classification_queue = None
+    _classification_worker = None
 
-@router.post("/analyze", response_model=ApiResponse)
-async def analyze_emergency(request: EmergencyRequest) -> Dict[str, Any]:
+
+async def _classify_batched(
+    classifier: EmergencyClassifier,
+    requests: List[EmergencyRequest]
+) -> List[Dict[str, Any]]:
+    """Classify inputs, grouped with concurrent requests when batching is running"""
+    if _classification_queue is None:
+        return await classifier.classify_batch(
+            input_types=[request.input.type for request in requests],
+            contents=[request.input.content for request in requests]
+        )
+    
+    loop = asyncio.get_running_loop()
+    futures = []
+    for request in requests:
+        future = loop.create_future()
+        _classification_queue.put_nowait(((request.input.type, request.input.content), future))
+        futures.append(future)
+    return list(await asyncio.gather(*futures))
+
+
+async def _find_nearest_hospital(
+    hospital_finder: BaseHospitalFinder,
+    location: Optional[LocationData]
+) -> Optional[Hospital]:
+    """Find the nearest hospital, or None when no location was provided"""
+    if not location:
+        return None
+    return await hospital_finder.find_nearest(
+        location=location,
+        radius=settings.DEFAULT_HOSPITAL_RADIUS
+    )
+
+
+async def _generate_instruction_lists(
+    first_aid_service: FirstAidGenerator,
+    classification_results: List[Dict[str, Any]],
+    severities: List[str]
+) -> List[List[FirstAidInstruction]]:
+    """Generate instructions for every classified emergency concurrently"""
+    return list(await asyncio.gather(*(
+        first_aid_service.generate_instructions(
+            emergency_type=classification_result["type"],
+            severity=severity
+        )
+        for classification_result, severity in zip(classification_results, severities)
+    )))
+
+
+async def _run_emergency_pipeline(
+    requests: List[EmergencyRequest],
+    classifier: EmergencyClassifier,
+    scorer: SeverityScorer,
+    first_aid_service: FirstAidGenerator,
+    hospital_finder: BaseHospitalFinder,
+    build_detection_as_model: bool = True,
+    detected_at: Optional[datetime] = None,
+) -> List[Tuple[Any, List[FirstAidInstruction], bool, Optional[Hospital]]]:
     """
-    Analyze emergency input and provide complete response with instructions
+    Classify, score and build first aid guidance for a batch of requests
     
-    - **input**: Emergency input (text, voice, or image)
-    - **userId**: Optional user identifier
-    - **sessionId**: Optional session identifier
+    Returns one (detection, instructions, should_call, nearest_hospital) tuple
+    per request, in input order. The detection is an EmergencyDetection stamped
+    with detected_at (default: now), or a plain dict stamped with the input
+    timestamp.
     """
+    detected_at = detected_at or datetime.now()
+    contents = [request.input.content for request in requests]
+    
+    # Hospital lookups only need the location, so start them right away
+    hospital_tasks = [
+        asyncio.create_task(_find_nearest_hospital(hospital_finder, request.input.location))
+        for request in requests
+    ]
+    
     try:
-        # Initialize services
-        classifier = EmergencyClassifier()
-        scorer = SeverityScorer()
+        # Classify emergencies (grouped with concurrent requests)
+        classification_results = await _classify_batched(classifier, requests)
         
-        # Classify emergency
-        classification_result = await classifier.classify(
-            input_type=request.input.type,
-            content=request.input.content
-        )
-        
-        # Score severity
-        severity_result = await scorer.score(
-            emergency_type=classification_result["type"],
-            content=request.input.content,
-            classification_confidence=classification_result["confidence"]
+        # Score all severities in one pass
+        severity_scoring = scorer.score_batch(
+            emergency_types=[result["type"] for result in classification_results],
+            contents=contents,
+            classification_confidences=[result["confidence"] for result in classification_results]
         )
         
+        # Generate first aid instructions concurrently with the hospital lookups
+        if first_aid_service.uses_severity:
+            severity_results = await severity_scoring
+            instruction_lists = await _generate_instruction_lists(
+                first_aid_service,
+                classification_results,
+                [result["severity"] for result in severity_results]
+            )
+        else:
+            # Template instructions ignore severity, so they don't wait for scoring
+            severity_results, instruction_lists = await asyncio.gather(
+                severity_scoring,
+                _generate_instruction_lists(
+                    first_aid_service,
+                    classification_results,
+                    ["moderate"] * len(classification_results)
+                )
+            )
+        nearest_hospitals = await asyncio.gather(*hospital_tasks)
+    finally:
+        for task in hospital_tasks:
+            task.cancel()
+    
+    results = []
+    for request, classification_result, severity_result, instructions, nearest_hospital in zip(
+        requests, classification_results, severity_results, instruction_lists, nearest_hospitals
+    ):
         # Determine if emergency call is needed
         should_call = (
             severity_result["severity"] == "critical" or
             severity_result["score"] >= settings.CRITICAL_SEVERITY_THRESHOLD
         )
         
-        # Get first aid instructions
-        first_aid_service = FirstAidGenerator()
-        instructions = await first_aid_service.generate_instructions(
-            emergency_type=classification_result["type"],
-            severity=severity_result["severity"]
-        )
-        
-        # Find nearest hospital if location provided
-        nearest_hospital = None
-        if request.input.location:
-            hospital_finder = HospitalFinder()
-            hospitals = await hospital_finder.find_nearby(
-                location=request.input.location,
-                radius=settings.DEFAULT_HOSPITAL_RADIUS
+        if build_detection_as_model:
+            detection = EmergencyDetection(
+                emergencyType=classification_result["type"],
+                severity=severity_result["severity"],
+                confidence=classification_result["confidence"],
+                detectedAt=detected_at,
             )
-            if hospitals:
-                nearest_hospital = hospitals[0]
+        else:
+            detection = {
+                "emergencyType": classification_result["type"],
+                "severity": severity_result["severity"],
+                "confidence": classification_result["confidence"],
+                "detectedAt": request.input.timestamp,
+            }
         
-        # Build detection object
-        detection = EmergencyDetection(
-            emergencyType=classification_result["type"],
-            severity=severity_result["severity"],
-            confidence=classification_result["confidence"],
-            detectedAt=datetime.now(),
+        results.append((detection, instructions, should_call, nearest_hospital))
+    
+    return results
+
+
+def _build_response(
+    detection: Any,
+    instructions: List[FirstAidInstruction],
+    should_call: bool,
+    nearest_hospital: Optional[Hospital],
+    timestamp: Any,
+) -> Dict[str, Any]:
+    """
+    Shape one pipeline result into an emergency response body
+    
+    Routes wrap it in ORJSONResponse themselves: a returned dict would
+    first be walked again by FastAPI's jsonable_encoder.
+    """
+    response_data = EmergencyResponse(
+        detection=detection,
+        instructions=instructions,
+        shouldCallEmergency=should_call,
+        nearestHospital=nearest_hospital,
+        estimatedResponseTime=15 if should_call else None,
+    )
+    
+    return {
+        "success": True,
+        "data": response_data.model_dump(),
+        "timestamp": timestamp,
+    }
+
+
+@router.post("/analyze", response_model=None, responses={200: {"model": ApiResponse}})
+async def analyze_emergency(
+    request: EmergencyRequest,
+    classifier: EmergencyClassifier = Depends(get_classifier),
+    scorer: SeverityScorer = Depends(get_severity_scorer),
+    first_aid_service: FirstAidGenerator = Depends(get_first_aid_generator),
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+) -> ORJSONResponse:
+    """
+    Analyze emergency input and provide complete response with instructions
+    
+    - **input**: Emergency input (text, voice, or image)
+    - **userId**: Optional user identifier
+    - **sessionId**: Optional session identifier
+    """
+    now = datetime.now()
+    
+    try:
+        results = await _run_emergency_pipeline(
+            [request], classifier, scorer, first_aid_service, hospital_finder,
+            detected_at=now,
         )
+        return ORJSONResponse(_build_response(*results[0], timestamp=now))
         
-        # Build response
-        response_data = EmergencyResponse(
-            detection=detection,
-            instructions=[FirstAidInstruction(**inst) for inst in instructions],
-            shouldCallEmergency=should_call,
-            nearestHospital=nearest_hospital,
-            estimatedResponseTime=15 if should_call else None,
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "success": False,
+                "error": {
+                    "code": "ANALYSIS_ERROR",
+                    "message": str(e),
+                },
+                "timestamp": now.isoformat(),
+            }
         )
-        
-        return {
-            "success": True,
-            "data": response_data.dict(),
-            "timestamp": datetime.now().isoformat(),
-        }
+
+
+@router.post("/analyze-batch", response_model=None, responses={200: {"model": List[ApiResponse]}})
+async def analyze_emergency_batch(
+    # Every item starts its own hospital lookup and instruction generation
+    requests: Annotated[List[EmergencyRequest], Body(max_length=settings.MAX_BATCH_REQUESTS)],
+    classifier: EmergencyClassifier = Depends(get_classifier),
+    scorer: SeverityScorer = Depends(get_severity_scorer),
+    first_aid_service: FirstAidGenerator = Depends(get_first_aid_generator),
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+) -> ORJSONResponse:
+    """
+    Analyze several emergency inputs in one call
+    
+    Responses are returned in the same order as the submitted requests.
+    At most MAX_BATCH_REQUESTS requests are accepted per call.
+    """
+    now = datetime.now()
+    
+    try:
+        results = await _run_emergency_pipeline(
+            requests, classifier, scorer, first_aid_service, hospital_finder,
+            detected_at=now,
+        )
+        return ORJSONResponse([_build_response(*result, timestamp=now) for result in results])
         
     except Exception as e:
         raise HTTPException(
@@ -106,13 +342,19 @@ async def analyze_emergency(request: EmergencyRequest) -> Dict[str, Any]:
                     "code": "ANALYSIS_ERROR",
                     "message": str(e),
                 },
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
             }
         )
 
 
-@router.post("/detect", response_model=ApiResponse)
-async def detect_emergency(request: EmergencyRequest) -> Dict[str, Any]:
+@router.post("/detect", response_model=None, responses={200: {"model": ApiResponse}})
+async def detect_emergency(
+    request: EmergencyRequest,
+    classifier: EmergencyClassifier = Depends(get_classifier),
+    scorer: SeverityScorer = Depends(get_severity_scorer),
+    first_aid_service: FirstAidGenerator = Depends(get_first_aid_generator),
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+) -> ORJSONResponse:
     """
     Detect emergency type and severity from user input
     
@@ -121,66 +363,12 @@ async def detect_emergency(request: EmergencyRequest) -> Dict[str, Any]:
     - **sessionId**: Optional session identifier
     """
     try:
-        # Initialize services
-        classifier = EmergencyClassifier()
-        scorer = SeverityScorer()
-        
-        # Classify emergency
-        classification_result = await classifier.classify(
-            input_type=request.input.type,
-            content=request.input.content
+        results = await _run_emergency_pipeline(
+            [request], classifier, scorer, first_aid_service, hospital_finder,
+            build_detection_as_model=False,
         )
-        
-        # Score severity
-        severity_result = await scorer.score(
-            emergency_type=classification_result["type"],
-            content=request.input.content,
-            classification_confidence=classification_result["confidence"]
-        )
-        
-        # Determine if emergency call is needed
-        should_call = (
-            severity_result["severity"] == "critical" or
-            severity_result["score"] >= settings.CRITICAL_SEVERITY_THRESHOLD
-        )
-        
-        # Get first aid instructions
-        first_aid_service = FirstAidGenerator()
-        instructions = await first_aid_service.generate_instructions(
-            emergency_type=classification_result["type"],
-            severity=severity_result["severity"]
-        )
-        
-        # Find nearest hospital if location provided
-        nearest_hospital = None
-        if request.input.location:
-            hospital_finder = HospitalFinder()
-            hospitals = await hospital_finder.find_nearby(
-                location=request.input.location,
-                radius=settings.DEFAULT_HOSPITAL_RADIUS
-            )
-            if hospitals:
-                nearest_hospital = hospitals[0]
-        
-        # Build response
-        response_data = EmergencyResponse(
-            detection={
-                "emergencyType": classification_result["type"],
-                "severity": severity_result["severity"],
-                "confidence": classification_result["confidence"],
-                "detectedAt": request.input.timestamp.isoformat(),
-            },
-            instructions=instructions,
-            shouldCallEmergency=should_call,
-            nearestHospital=nearest_hospital.dict() if nearest_hospital else None,
-            estimatedResponseTime=15 if should_call else None,
-        )
-        
-        return {
-            "success": True,
-            "data": response_data.dict(),
-            "timestamp": response_data.detection["detectedAt"],
-        }
+        # Detections carry the input's own timestamp
+        return ORJSONResponse(_build_response(*results[0], timestamp=results[0][0]["detectedAt"]))
         
     except Exception as e:
         raise HTTPException(
@@ -196,49 +384,41 @@ async def detect_emergency(request: EmergencyRequest) -> Dict[str, Any]:
         )
 
 
-@router.post("/first-aid", response_model=ApiResponse)
-async def get_first_aid_instructions(request: FirstAidRequest) -> Dict[str, Any]:
+@router.post("/first-aid", response_model=None, responses={200: {"model": ApiResponse}})
+async def get_first_aid_instructions(
+    request: FirstAidRequest,
+    first_aid_service: FirstAidGenerator = Depends(get_first_aid_generator),
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+) -> ORJSONResponse:
     """
     Get first aid instructions for a specific emergency type and severity
     """
+    now = datetime.now()
+    
     try:
-        first_aid_service = FirstAidGenerator()
-        instructions = await first_aid_service.generate_instructions(
-            emergency_type=request.emergencyType,
-            severity=request.severity
+        # Instructions and hospital lookup are independent, run them together
+        instructions, nearest_hospital = await asyncio.gather(
+            first_aid_service.generate_instructions(
+                emergency_type=request.emergencyType,
+                severity=request.severity
+            ),
+            _find_nearest_hospital(hospital_finder, request.location),
         )
         
-        # Find nearest hospital if location provided
-        nearest_hospital = None
-        if request.location:
-            hospital_finder = HospitalFinder()
-            hospitals = await hospital_finder.find_nearby(
-                location=request.location,
-                radius=settings.DEFAULT_HOSPITAL_RADIUS
-            )
-            if hospitals:
-                nearest_hospital = hospitals[0]
-        
         detection = EmergencyDetection(
             emergencyType=request.emergencyType,
             severity=request.severity,
             confidence=1.0,
-            detectedAt=datetime.now(),
+            detectedAt=now,
         )
         
-        response_data = EmergencyResponse(
-            detection=detection,
-            instructions=[FirstAidInstruction(**inst) for inst in instructions],
-            shouldCallEmergency=request.severity == "critical",
-            nearestHospital=nearest_hospital,
-            estimatedResponseTime=15 if request.severity == "critical" else None,
-        )
-        
-        return {
-            "success": True,
-            "data": response_data.dict(),
-            "timestamp": datetime.now().isoformat(),
-        }
+        return ORJSONResponse(_build_response(
+            detection,
+            instructions,
+            request.severity == "critical",
+            nearest_hospital,
+            timestamp=now,
+        ))
         
     except Exception as e:
         raise HTTPException(
@@ -254,7 +434,33 @@ async def get_first_aid_instructions(request: FirstAidRequest) -> Dict[str, Any]
         )
 
 
+@router.post("/first-aid/stream", response_model=None)
+async def stream_first_aid_instructions(
+    request: FirstAidRequest,
+    first_aid_service: FirstAidGenerator = Depends(get_first_aid_generator),
+) -> StreamingResponse:
+    """
+    Stream first aid instructions as server-sent events, one step per event,
+    so the first step can be shown before the rest is generated
+    """
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for instruction in first_aid_service.stream_instructions(
+                emergency_type=request.emergencyType,
+                severity=request.severity
+            ):
+                yield b"data: " + orjson.dumps(instruction.model_dump()) + b"\n\n"
+        except Exception as e:
+            logger.error("First aid streaming error: %s", e)
+            error = {"code": "FIRST_AID_ERROR", "message": str(e)}
+            yield b"event: error\ndata: " + orjson.dumps(error) + b"\n\n"
+            return
+        yield b"event: done\ndata: {}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.get("/health")
 async def health_check():
     """Emergency service health check"""
-    return {"status": "healthy", "service": "emergency"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -2,18 +2,32 @@
 LIFELINE AI - Hospital Finder Endpoint
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from typing import Dict, Any, List, Union
+import orjson
 
-from app.models.schemas import HospitalSearchRequest, Hospital, ApiResponse
-from app.services.location.hospital_finder_osm import HospitalFinder
+from app.models.schemas import HospitalSearchRequest, Hospital, ApiResponse, LocationData
+from app.services.location.base import BaseHospitalFinder
+from app.api.deps import get_hospital_finder
 from app.core.config import settings
 
 router = APIRouter()
 
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "hospitals"})
 
-@router.post("/nearby")
-async def find_nearby_hospitals(request: HospitalSearchRequest) -> Dict[str, Any]:
+# Diagnostic routes, only mounted when DEBUG is on
+debug_router = APIRouter()
+
+# NYC coordinates used by the test route
+_TEST_LOCATION = LocationData(latitude=40.7128, longitude=-74.0060)
+
+
+@router.post("/nearby", response_model=None)
+async def find_nearby_hospitals(
+    request: HospitalSearchRequest,
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+) -> Union[ORJSONResponse, Dict[str, Any]]:
     """
     Find nearby hospitals based on location
     
@@ -21,7 +35,6 @@ async def find_nearby_hospitals(request: HospitalSearchRequest) -> Dict[str, Any
     - **radius**: Search radius in kilometers (default: 10km, max: 100km)
     """
     try:
-        hospital_finder = HospitalFinder()
         hospitals = await hospital_finder.find_nearby(
             location=request.location,
             radius=request.radius
@@ -30,11 +43,14 @@ async def find_nearby_hospitals(request: HospitalSearchRequest) -> Dict[str, Any
         # Limit results
         hospitals = hospitals[:settings.MAX_HOSPITAL_RESULTS]
         
-        return {
+        # Returning the response directly hands the model_dump() dicts
+        # straight to orjson; a plain dict would first be walked again by
+        # FastAPI's jsonable_encoder
+        return ORJSONResponse({
             "success": True,
-            "data": [hospital.dict() for hospital in hospitals],
+            "data": [hospital.model_dump() for hospital in hospitals],
             "timestamp": None,
-        }
+        })
         
     except Exception as e:
         return {
@@ -50,26 +66,23 @@ async def find_nearby_hospitals(request: HospitalSearchRequest) -> Dict[str, Any
 @router.get("/health")
 async def health_check():
     """Hospital service health check"""
-    return {"status": "healthy", "service": "hospitals"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-@router.get("/test")
-async def test_hospitals():
+@debug_router.get("/test")
+async def test_hospitals(
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+):
     """Test endpoint with mock data"""
     try:
-        from app.models.schemas import LocationData
-        
-        # Test with NYC coordinates
-        test_location = LocationData(latitude=40.7128, longitude=-74.0060)
-        hospital_finder = HospitalFinder()
-        hospitals = await hospital_finder.find_nearby(test_location, 50.0)
+        hospitals = await hospital_finder.find_nearby(_TEST_LOCATION, 50.0)
         
-        return {
+        return ORJSONResponse({
             "success": True,
-            "data": [hospital.dict() for hospital in hospitals],
+            "data": [hospital.model_dump() for hospital in hospitals],
             "message": f"Found {len(hospitals)} test hospitals",
             "timestamp": None,
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -2,19 +2,45 @@
 LIFELINE AI - Voice Input Processing Endpoint
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+import orjson
 
-from app.models.schemas import VoiceInputRequest, EmergencyRequest, ApiResponse
+from app.models.schemas import VoiceInputRequest, EmergencyRequest, EmergencyInput, InputType, ApiResponse
 from app.services.ai.voice_processor import VoiceProcessor
 from app.services.ai.emergency_classifier import EmergencyClassifier
+from app.services.ai.severity_scorer import SeverityScorer
+from app.services.ai.first_aid_generator import FirstAidGenerator
+from app.services.location.base import BaseHospitalFinder
+from app.api.v1.endpoints.emergency import (
+    _run_emergency_pipeline,
+    _build_response,
+)
+from app.api.deps import (
+    get_voice_processor,
+    get_classifier,
+    get_severity_scorer,
+    get_first_aid_generator,
+    get_hospital_finder,
+)
 from app.core.config import settings
 
 router = APIRouter()
 
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "voice"})
 
-@router.post("/process", response_model=ApiResponse)
-async def process_voice_input(request: VoiceInputRequest) -> Dict[str, Any]:
+_SUPPORTED_FORMATS_TEXT = ", ".join(settings.SUPPORTED_AUDIO_FORMATS)
+
+
+@router.post("/process", response_model=None, responses={200: {"model": ApiResponse}})
+async def process_voice_input(
+    request: VoiceInputRequest,
+    voice_processor: VoiceProcessor = Depends(get_voice_processor),
+    classifier: EmergencyClassifier = Depends(get_classifier),
+    scorer: SeverityScorer = Depends(get_severity_scorer),
+    first_aid_service: FirstAidGenerator = Depends(get_first_aid_generator),
+    hospital_finder: BaseHospitalFinder = Depends(get_hospital_finder),
+) -> ORJSONResponse:
     """
     Process voice/audio input and detect emergency
     
@@ -24,41 +50,40 @@ async def process_voice_input(request: VoiceInputRequest) -> Dict[str, Any]:
     """
     try:
         # Validate audio format
-        if request.format.lower() not in settings.SUPPORTED_AUDIO_FORMATS:
+        if request.format.lower() not in settings.SUPPORTED_AUDIO_FORMATS_SET:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
                     "success": False,
                     "error": {
                         "code": "UNSUPPORTED_FORMAT",
-                        "message": f"Audio format '{request.format}' not supported. Supported formats: {', '.join(settings.SUPPORTED_AUDIO_FORMATS)}",
+                        "message": f"Audio format '{request.format}' not supported. Supported formats: {_SUPPORTED_FORMATS_TEXT}",
                     },
                     "timestamp": None,
                 }
             )
         
         # Process voice to text
-        voice_processor = VoiceProcessor()
         transcribed_text = await voice_processor.transcribe(
             audio_data=request.audio,
             format=request.format
         )
         
         # Create emergency input from transcription
-        emergency_input = {
-            "type": "text",
-            "content": transcribed_text,
-            "timestamp": None,
-            "location": request.location.dict() if request.location else None,
-        }
+        emergency_input = EmergencyInput(
+            type=InputType.TEXT,
+            content=transcribed_text,
+            location=request.location,
+        )
         
-        # Use emergency detection endpoint logic
+        # Run the shared emergency detection pipeline
         emergency_request = EmergencyRequest(input=emergency_input)
-        
-        # Import here to avoid circular dependency
-        from app.api.v1.endpoints.emergency import detect_emergency
-        
-        return await detect_emergency(emergency_request)
+        results = await _run_emergency_pipeline(
+            [emergency_request], classifier, scorer, first_aid_service, hospital_finder,
+            build_detection_as_model=False,
+        )
+        # Detections carry the input's own timestamp
+        return ORJSONResponse(_build_response(*results[0], timestamp=results[0][0]["detectedAt"]))
         
     except HTTPException:
         raise
@@ -79,4 +104,4 @@ async def process_voice_input(request: VoiceInputRequest) -> Dict[str, Any]:
 @router.get("/health")
 async def health_check():
     """Voice service health check"""
-    return {"status": "healthy", "service": "voice"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -3,71 +3,152 @@ LIFELINE AI - Configuration Management
 Environment variables and application settings
 """
 
-from pydantic_settings import BaseSettings
-from typing import List
+from functools import cached_property, lru_cache
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import FrozenSet, Tuple, Union
 import os
 
 
 class Settings(BaseSettings):
-    """Application settings"""
+    """Application settings (read from the environment and .env once, at construction)"""
+
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, frozen=True)
 
     # Project Info
     PROJECT_NAME: str = "LIFELINE AI"
     VERSION: str = "1.0.0"
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    DEBUG: bool = False
 
     # Server
-    HOST: str = os.getenv("HOST", "0.0.0.0")
-    PORT: int = int(os.getenv("PORT", "8000"))
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 0  # 0 = one worker per CPU
 
     # API
     API_V1_PREFIX: str = "/api/v1"
 
     # CORS
-    CORS_ORIGINS: List[str] = [
+    # The str alternative lets list settings come from the environment as
+    # comma-separated values (see .env.example) instead of JSON; the
+    # validator below always turns them into tuples
+    CORS_ORIGINS: Union[Tuple[str, ...], str] = (
         "http://localhost:3000",
         "http://localhost:8081",
         "http://localhost:19006",
-        "exp://*",
-        "http://*",
-        "https://*",
-    ]
+    )
+    # Starlette treats "*" inside an origin literally, so scheme-wide
+    # matches (Expo clients, any http/https host) go through one regex
+    CORS_ORIGIN_REGEX: str = r"^(https?|exp)://.*$"
 
     # AI/LLM Configuration
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    AI_ENABLED: bool = os.getenv("AI_ENABLED", "True").lower() == "true"
+    OPENAI_API_KEY: str = ""
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    AI_ENABLED: bool = True
+    # Account-wide OpenAI budgets; each worker process enforces an equal
+    # share (see SERVER_PROCESSES)
+    OPENAI_MAX_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_MAX_TOKENS_PER_MINUTE: int = 200000
+    OPENAI_MAX_CONCURRENCY: int = 16
+    # Per-call timeouts; image and audio uploads get the longer media timeout
+    OPENAI_TIMEOUT_SECONDS: float = 10.0
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    OPENAI_MEDIA_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_RETRIES: int = 1
+
+    # Semantic cache of AI classifications and severity scores (cosine
+    # similarity on embeddings); the path only persists classifications
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_SIZE: int = 10000
+    SEMANTIC_CACHE_PATH: str = ""  # empty = keep in memory only
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # Lifetime of cached AI first aid instructions
+    INSTRUCTION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
 
     # Emergency Detection
-    EMERGENCY_CONFIDENCE_THRESHOLD: float = float(
-        os.getenv("EMERGENCY_CONFIDENCE_THRESHOLD", "0.7")
-    )
-    CRITICAL_SEVERITY_THRESHOLD: float = float(
-        os.getenv("CRITICAL_SEVERITY_THRESHOLD", "0.8")
-    )
+    EMERGENCY_CONFIDENCE_THRESHOLD: float = 0.7
+    CRITICAL_SEVERITY_THRESHOLD: float = 0.8
+    # Serve the trained naive Bayes models with int8-quantized weights
+    CUSTOM_MODEL_QUANTIZE: bool = True
+    # Prefer exported .onnx graphs (run by onnxruntime) over the pickles
+    CUSTOM_MODEL_ONNX: bool = True
+
+    # Micro-batching of single-item classification requests
+    BATCH_MAX_LATENCY_MS: int = 5
+    BATCH_MAX_SIZE: int = 16
+    # Most requests accepted in one /analyze-batch body
+    MAX_BATCH_REQUESTS: int = 32
 
     # Hospital Search
-    DEFAULT_HOSPITAL_RADIUS: float = float(os.getenv("DEFAULT_HOSPITAL_RADIUS", "10"))
-    MAX_HOSPITAL_RESULTS: int = int(os.getenv("MAX_HOSPITAL_RESULTS", "10"))
+    DEFAULT_HOSPITAL_RADIUS: float = 10.0
+    MAX_HOSPITAL_RESULTS: int = 10
+    HOSPITAL_CACHE_TTL_SECONDS: int = 300
+    HOSPITAL_CACHE_SIZE: int = 4096
+    # Raw provider responses are shared by nearby searches for longer,
+    # since hospital listings change slowly
+    HOSPITAL_RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    # How long to wait for a provider (OSM or Google Places) before
+    # answering with generated fallback hospitals
+    HOSPITAL_SEARCH_TIMEOUT_SECONDS: float = 5.0
 
     # Google Places API
-    GOOGLE_PLACES_API_KEY: str = os.getenv("GOOGLE_PLACES_API_KEY", "")
-    GOOGLE_PLACES_ENABLED: bool = os.getenv("GOOGLE_PLACES_ENABLED", "True").lower() == "true"
+    GOOGLE_PLACES_API_KEY: str = ""
+    GOOGLE_PLACES_ENABLED: bool = True
 
     # Voice Processing
-    MAX_AUDIO_DURATION: int = int(os.getenv("MAX_AUDIO_DURATION", "60"))  # seconds
-    SUPPORTED_AUDIO_FORMATS: List[str] = ["wav", "mp3", "m4a", "flac"]
+    # "gpt-4o-mini-transcribe" / "gpt-4o-transcribe" are faster where available
+    OPENAI_TRANSCRIPTION_MODEL: str = "whisper-1"
+    MAX_AUDIO_DURATION: int = 60  # seconds
+    MAX_AUDIO_SIZE: int = 10485760  # 10MB
+    SUPPORTED_AUDIO_FORMATS: Union[Tuple[str, ...], str] = ("wav", "mp3", "m4a", "flac")
 
     # Image Processing
-    MAX_IMAGE_SIZE: int = int(os.getenv("MAX_IMAGE_SIZE", "5242880"))  # 5MB
-    SUPPORTED_IMAGE_FORMATS: List[str] = ["jpg", "jpeg", "png", "webp"]
+    MAX_IMAGE_SIZE: int = 5242880  # 5MB
+    SUPPORTED_IMAGE_FORMATS: Union[Tuple[str, ...], str] = ("jpg", "jpeg", "png", "webp")
+    # Larger photos are downscaled to fit this box (pixels) before the
+    # vision call; triage doesn't need full resolution
+    IMAGE_MAX_DIMENSION: int = 1024
+    IMAGE_JPEG_QUALITY: int = 80
+    OPENAI_IMAGE_DETAIL: str = "auto"  # low, high or auto
 
     # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = "INFO"
+
+    @field_validator("CORS_ORIGINS", "SUPPORTED_AUDIO_FORMATS", "SUPPORTED_IMAGE_FORMATS", mode="before")
+    @classmethod
+    def split_comma_separated(cls, value):
+        """Accept "a,b,c" from the environment as well as sequences"""
+        if isinstance(value, str):
+            return tuple(item.strip() for item in value.split(",") if item.strip())
+        return tuple(value)
+
+    @field_validator("WORKERS")
+    @classmethod
+    def default_workers_to_cpu_count(cls, value: int) -> int:
+        """Resolve WORKERS=0 to the number of CPUs"""
+        return value or (os.cpu_count() or 1)
+
+    @cached_property
+    def SERVER_PROCESSES(self) -> int:
+        """Worker processes the server runs (one in DEBUG, where it auto-reloads)"""
+        return 1 if self.DEBUG else self.WORKERS
+
+    @cached_property
+    def SUPPORTED_AUDIO_FORMATS_SET(self) -> FrozenSet[str]:
+        """Supported audio formats for O(1) membership checks"""
+        return frozenset(self.SUPPORTED_AUDIO_FORMATS)
+
+    @cached_property
+    def SUPPORTED_IMAGE_FORMATS_SET(self) -> FrozenSet[str]:
+        """Supported image formats for O(1) membership checks"""
+        return frozenset(self.SUPPORTED_IMAGE_FORMATS)
+
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+@lru_cache()
+def get_settings() -> Settings:
+    """Shared settings instance (for dependency injection)"""
+    return Settings()
 
 
-settings = Settings()
+settings = get_settings()
@@ -3,10 +3,25 @@ LIFELINE AI - Pydantic Schemas
 Request and response models
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+import re
+
+from app.core.config import settings
+
+# Standard base64 alphabet (line breaks allowed for MIME-wrapped payloads)
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/=\r\n]+")
+
+
+def _validate_base64_payload(value: str, max_bytes: int) -> str:
+    """Reject oversized or non-base64 payloads before anything decodes them"""
+    if len(value) * 3 // 4 > max_bytes:
+        raise ValueError(f"Decoded payload exceeds the {max_bytes} byte limit")
+    if not _BASE64_RE.fullmatch(value):
+        raise ValueError("Payload is not valid base64")
+    return value
 
 
 class EmergencyType(str, Enum):
@@ -70,6 +85,8 @@ class EmergencyDetection(BaseModel):
 
 class FirstAidInstruction(BaseModel):
     """First aid instruction step"""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Instruction identifier")
     step: int = Field(..., ge=1, description="Step number")
     title: str = Field(..., description="Step title")
@@ -126,9 +143,20 @@ class VoiceInputRequest(BaseModel):
     format: str = Field(default="wav", description="Audio format")
     location: Optional[LocationData] = Field(None, description="User location")
 
+    @field_validator("audio")
+    @classmethod
+    def validate_audio(cls, value: str) -> str:
+        return _validate_base64_payload(value, settings.MAX_AUDIO_SIZE)
+
 
 class ImageInputRequest(BaseModel):
     """Image input request"""
     image: str = Field(..., description="Base64 encoded image data")
     format: str = Field(default="jpeg", description="Image format")
     location: Optional[LocationData] = Field(None, description="User location")
+
+    @field_validator("image")
+    @classmethod
+    def validate_image(cls, value: str) -> str:
+        return _validate_base64_payload(value, settings.MAX_IMAGE_SIZE)
+
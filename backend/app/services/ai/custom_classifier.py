@@ -3,14 +3,24 @@ LIFELINE AI - Custom Model Service
 Use trained emergency classification model
 """
 
+from functools import lru_cache
 import joblib
 import json
+import numpy as np
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
 
+from app.core.config import settings
+from app.services.ai.onnx_model import load_onnx_pipeline
+from app.services.ai.quantized_model import QuantizedNBPipeline, quantize_pipeline
+from app.services.ai.tfidf import TfidfFeatures
+
 logger = logging.getLogger(__name__)
 
+# Largest number of texts vectorized in one predict_proba call
+MAX_INFERENCE_BATCH_SIZE = 256
+
 class CustomEmergencyClassifier:
     """Custom trained emergency classifier"""
     
@@ -18,6 +28,8 @@ class CustomEmergencyClassifier:
         self.category_model = None
         self.severity_model = None
         self.config = None
+        # Set when both models score the same TF-IDF features
+        self._shared_features = None
         self.load_models()
     
     def load_models(self):
@@ -30,52 +42,142 @@ class CustomEmergencyClassifier:
             sev_path = os.path.join(model_dir, '../../emergency_severity_model.pkl')
             config_path = os.path.join(model_dir, '../../model_config.json')
             
-            if os.path.exists(cat_path) and os.path.exists(sev_path):
-                self.category_model = joblib.load(cat_path)
-                self.severity_model = joblib.load(sev_path)
+            if settings.CUSTOM_MODEL_ONNX and self._load_onnx_models(model_dir):
+                logger.info("Custom models loaded with onnxruntime")
+            elif os.path.exists(cat_path) and os.path.exists(sev_path):
+                # Uncompressed joblib files keep numpy arrays in place, so they
+                # are mapped read-only from the page cache (shared by workers)
+                # instead of being copied into each process
+                self.category_model = joblib.load(cat_path, mmap_mode='r')
+                self.severity_model = joblib.load(sev_path, mmap_mode='r')
                 
-                if os.path.exists(config_path):
-                    with open(config_path, 'r') as f:
-                        self.config = json.load(f)
+                # int8 naive Bayes weights: smaller resident set, same interface
+                if settings.CUSTOM_MODEL_QUANTIZE:
+                    self.category_model = quantize_pipeline(self.category_model)
+                    self.severity_model = quantize_pipeline(self.severity_model)
+                    self._shared_features = self._find_shared_features()
                 
                 logger.info("Custom models loaded successfully")
             else:
                 logger.warning("Custom models not found, will use fallback")
+            
+            if self.is_available() and os.path.exists(config_path):
+                with open(config_path, 'r') as f:
+                    self.config = json.load(f)
+                self._check_config_labels()
                 
         except Exception as e:
-            logger.error(f"Error loading custom models: {e}")
+            logger.error("Error loading custom models: %s", e)
+    
+    def _load_onnx_models(self, model_dir: str) -> bool:
+        """Use exported ONNX graphs when both exist and onnxruntime is installed"""
+        cat_path = os.path.join(model_dir, '../../emergency_category_model.onnx')
+        sev_path = os.path.join(model_dir, '../../emergency_severity_model.onnx')
+        if not (os.path.exists(cat_path) and os.path.exists(sev_path)):
+            return False
+        
+        category_model = load_onnx_pipeline(cat_path)
+        severity_model = load_onnx_pipeline(sev_path)
+        if category_model is None or severity_model is None:
+            return False
+        
+        self.category_model = category_model
+        self.severity_model = severity_model
+        return True
+    
+    def _find_shared_features(self) -> Optional[TfidfFeatures]:
+        """
+        Vectorizer features of the category model if the severity model
+        was trained on identical ones, so each text is vectorized once
+        """
+        if not (
+            isinstance(self.category_model, QuantizedNBPipeline)
+            and isinstance(self.severity_model, QuantizedNBPipeline)
+        ):
+            return None
+        
+        features = self.category_model.features
+        return features if features.matches(self.severity_model.features) else None
+    
+    def _check_config_labels(self):
+        """Warn when model_config.json lists other labels than the models' classes"""
+        for key, model in (("categories", self.category_model), ("severities", self.severity_model)):
+            labels = self.config.get(key)
+            # Older training runs wrote the labels unordered, so only compare the sets
+            if labels is not None and set(labels) != set(model.classes_.tolist()):
+                logger.warning("model_config.json %s do not match the model classes; retrain to refresh it", key)
     
     def is_available(self) -> bool:
         """Check if custom models are available"""
         return self.category_model is not None and self.severity_model is not None
     
+    def warm_up(self):
+        """Run one throwaway prediction so the first request skips cold-start costs"""
+        if not self.is_available():
+            return
+        
+        try:
+            self.classify_batch(["warmup"])
+        except Exception as e:
+            logger.warning("Custom model warm-up failed: %s", e)
+    
     def classify(self, text: str) -> Dict[str, Any]:
         """Classify emergency text"""
+        return self.classify_batch([text])[0]
+    
+    def classify_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify several emergency texts with one call per model"""
         if not self.is_available():
             raise ValueError("Custom models not available")
         
+        # Very large batches are split so one sparse matrix stays bounded
+        if len(texts) > MAX_INFERENCE_BATCH_SIZE:
+            return [
+                result
+                for start in range(0, len(texts), MAX_INFERENCE_BATCH_SIZE)
+                for result in self.classify_batch(texts[start:start + MAX_INFERENCE_BATCH_SIZE])
+            ]
+        
         try:
-            # Predict category and severity
-            category = self.category_model.predict([text])[0]
-            severity = self.severity_model.predict([text])[0]
+            # One predict_proba per model; argmax over it is what predict() returns
+            if self._shared_features is not None:
+                X = self._shared_features.transform(texts)
+                cat_probas = self.category_model.predict_proba_features(X)
+                sev_probas = self.severity_model.predict_proba_features(X)
+            else:
+                cat_probas = self.category_model.predict_proba(texts)
+                sev_probas = self.severity_model.predict_proba(texts)
+            cat_indices = cat_probas.argmax(axis=1)
+            sev_indices = sev_probas.argmax(axis=1)
             
-            # Get confidence scores
-            cat_proba = self.category_model.predict_proba([text])[0]
-            sev_proba = self.severity_model.predict_proba([text])[0]
+            categories = self.category_model.classes_[cat_indices].tolist()
+            severities = self.severity_model.classes_[sev_indices].tolist()
+            cat_confidences = cat_probas[np.arange(len(texts)), cat_indices].tolist()
+            sev_confidences = sev_probas[np.arange(len(texts)), sev_indices].tolist()
             
-            cat_confidence = max(cat_proba)
-            sev_confidence = max(sev_proba)
-            overall_confidence = (cat_confidence + sev_confidence) / 2
+            results = []
+            for category, severity, cat_confidence, sev_confidence in zip(
+                categories, severities, cat_confidences, sev_confidences
+            ):
+                overall_confidence = (cat_confidence + sev_confidence) / 2
+                
+                results.append({
+                    "type": category,
+                    "confidence": float(overall_confidence),
+                    "severity": severity,
+                    "severity_confidence": float(sev_confidence),
+                    "reasoning": f"Custom model classification (confidence: {overall_confidence:.2f})",
+                    "source": "custom_model"
+                })
             
-            return {
-                "type": category,
-                "confidence": float(overall_confidence),
-                "severity": severity,
-                "severity_confidence": float(sev_confidence),
-                "reasoning": f"Custom model classification (confidence: {overall_confidence:.2f})",
-                "source": "custom_model"
-            }
+            return results
             
         except Exception as e:
-            logger.error(f"Custom model classification error: {e}")
-            raise
\ No newline at end of file
+            logger.error("Custom model classification error: %s", e)
+            raise
+
+
+@lru_cache(maxsize=1)
+def get_custom_classifier() -> CustomEmergencyClassifier:
+    """Process-wide classifier so the pickled pipelines are loaded only once"""
+    return CustomEmergencyClassifier()
@@ -3,16 +3,116 @@ LIFELINE AI - Emergency Classifier Service
 AI-powered emergency type classification
 """
 
-from typing import Dict, Any
+from collections import Counter
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
+import asyncio
 import logging
-import json
 
 from app.core.config import settings
 from app.models.schemas import EmergencyType
-from app.services.ai.custom_classifier import CustomEmergencyClassifier
+from app.services.ai.custom_classifier import get_custom_classifier
+from app.services.ai.keyword_matcher import KeywordMatcher
+from app.services.ai.openai_client import get_openai_client, stream_json_completion
+from app.services.ai.semantic_cache import SemanticCache
+from app.services.ai.rate_limiter import estimate_tokens, openai_limiter
 
 logger = logging.getLogger(__name__)
 
+# Token allowance reserved for each classification response
+CLASSIFICATION_RESPONSE_TOKENS = 100
+
+# Limits for packing several inputs into one classification prompt
+AI_BATCH_MAX_ITEMS = 20
+AI_BATCH_MAX_PROMPT_TOKENS = 6000
+
+# Values accepted from the AI classifier
+_VALID_EMERGENCY_TYPES = frozenset(e.value for e in EmergencyType)
+
+# Category bullet list shared by the single and batched prompts
+_CATEGORY_LIST = "\n".join(f"- {e.value}" for e in EmergencyType)
+
+# Fixed instructions go in the system message, so the server-side prompt
+# cache sees an identical prefix and the user message is only the input
+_CLASSIFY_SYSTEM_PROMPT = f"""You are an emergency medical classification AI.
+Analyze the emergency situation described by the user and classify it into one of these categories:
+{_CATEGORY_LIST}"""
+
+_CLASSIFY_BATCH_SYSTEM_PROMPT = f"""You are an emergency medical classification AI.
+Analyze each of the numbered emergency situations described by the user and classify it into one of these categories:
+{_CATEGORY_LIST}
+
+Return one result per description."""
+
+_CLASSIFY_SYSTEM_TOKENS = estimate_tokens(_CLASSIFY_SYSTEM_PROMPT)
+_CLASSIFY_BATCH_SYSTEM_TOKENS = estimate_tokens(_CLASSIFY_BATCH_SYSTEM_PROMPT)
+
+# Function-calling schemas; the API enforces the enum and required keys,
+# so malformed JSON no longer forces a rules fallback
+_CLASSIFICATION_PROPERTIES = {
+    "type": {"type": "string", "enum": sorted(_VALID_EMERGENCY_TYPES)},
+    "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+    "reasoning": {"type": "string", "description": "short explanation"},
+}
+
+_CLASSIFY_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "classify",
+        "description": "Record the emergency classification",
+        "parameters": {
+            "type": "object",
+            "properties": _CLASSIFICATION_PROPERTIES,
+            "required": ["type", "confidence"],
+        },
+    },
+}
+
+_CLASSIFY_BATCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "classify_batch",
+        "description": "Record one classification per numbered emergency description",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer"},
+                            **_CLASSIFICATION_PROPERTIES,
+                        },
+                        "required": ["index", "type", "confidence"],
+                    },
+                },
+            },
+            "required": ["results"],
+        },
+    },
+}
+
+# Keywords for the rule-based fallback, per first aid category
+RULE_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "cuts-wounds": ("cut", "wound", "bleeding", "blood", "gash", "laceration", "scrape"),
+    "burns": ("burn", "scald", "fire", "hot", "steam", "chemical burn"),
+    "choking": ("choking", "can't breathe", "swallowed", "stuck in throat", "gagging"),
+    "cpr": ("unconscious", "not breathing", "no pulse", "cardiac arrest", "collapsed"),
+    "sprains": ("sprain", "twisted", "ankle", "wrist", "swollen", "can't move"),
+    "nosebleed": ("nosebleed", "nose bleeding", "bloody nose"),
+    "allergic-reaction": ("allergic", "rash", "hives", "swelling", "itchy", "reaction"),
+    "fainting": ("fainted", "dizzy", "lightheaded", "passed out", "unconscious"),
+})
+
+# Categories each keyword counts towards
+_KEYWORD_TYPES: Dict[str, List[str]] = {}
+for _emergency_type, _keyword_list in RULE_KEYWORDS.items():
+    for _keyword in _keyword_list:
+        _KEYWORD_TYPES.setdefault(_keyword, []).append(_emergency_type)
+
+_KEYWORD_MATCHER = KeywordMatcher(_KEYWORD_TYPES)
+
 
 class EmergencyClassifier:
     """Classify emergency type from input content"""
@@ -20,7 +120,15 @@ class EmergencyClassifier:
     def __init__(self):
         self.ai_enabled = settings.AI_ENABLED
         self.openai_key = settings.OPENAI_API_KEY
-        self.custom_classifier = CustomEmergencyClassifier()
+        self.custom_classifier = get_custom_classifier()
+        self._aclient = get_openai_client()
+        self._semantic_cache = None
+        if self._aclient is not None and settings.SEMANTIC_CACHE_ENABLED:
+            self._semantic_cache = SemanticCache(
+                max_entries=settings.SEMANTIC_CACHE_SIZE,
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                path=settings.SEMANTIC_CACHE_PATH,
+            )
         
     async def classify(
         self,
@@ -30,97 +138,159 @@ class EmergencyClassifier:
         """
         Classify emergency type from input
         """
+        results = await self.classify_batch([input_type], [content])
+        return results[0]
+    
+    async def classify_batch(
+        self,
+        input_types: List[str],
+        contents: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify several emergency inputs, preserving input order
+        """
         try:
             # Try custom model first
             if self.custom_classifier.is_available():
-                return self.custom_classifier.classify(content)
-            elif self.ai_enabled and self.openai_key:
-                return await self._classify_with_ai(content)
+                return self.custom_classifier.classify_batch(contents)
+            elif self._aclient is not None:
+                return await self._classify_many_with_ai(contents)
             else:
-                return await self._classify_with_rules(content)
+                return [await self._classify_with_rules(content) for content in contents]
                 
         except Exception as e:
-            logger.error(f"Classification error: {str(e)}")
-            return await self._classify_with_rules(content)
+            logger.error("Classification error: %s", e)
+            return [await self._classify_with_rules(content) for content in contents]
     
     async def _classify_with_ai(self, content: str) -> Dict[str, Any]:
         """Classify using AI/LLM"""
         try:
-            from openai import OpenAI
+            result = await openai_limiter.call(
+                _CLASSIFY_SYSTEM_TOKENS + estimate_tokens(content) + CLASSIFICATION_RESPONSE_TOKENS,
+                lambda: stream_json_completion(
+                    self._aclient,
+                    model=settings.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": _CLASSIFY_SYSTEM_PROMPT},
+                        {"role": "user", "content": content}
+                    ],
+                    tools=[_CLASSIFY_TOOL],
+                    tool_choice={"type": "function", "function": {"name": "classify"}},
+                    temperature=0.2,
+                ),
+            )
+            return self._normalize_ai_result(result)
+
+        except Exception as e:
+            logger.warning("AI classification failed: %s, falling back to rules", e)
+            return await self._classify_with_rules(content)
+    
+    def save_semantic_cache(self):
+        """Persist the semantic cache, if one is configured"""
+        if self._semantic_cache is not None:
+            self._semantic_cache.save()
+    
+    async def _classify_many_with_ai(self, contents: List[str]) -> List[Dict[str, Any]]:
+        """Classify with AI, reusing results for near-duplicate earlier inputs"""
+        if self._semantic_cache is None:
+            return await self._classify_groups_with_ai(contents)
+        
+        return await self._semantic_cache.resolve(
+            self._aclient,
+            contents,
+            lambda indices: self._classify_groups_with_ai([contents[index] for index in indices]),
+            hit_source="semantic_cache",
+        )
+    
+    async def _classify_groups_with_ai(self, contents: List[str]) -> List[Dict[str, Any]]:
+        """Classify several inputs with one completion per prompt-sized group"""
+        if len(contents) == 1:
+            return [await self._classify_with_ai(contents[0])]
+        
+        # Group inputs so each prompt stays within the item and token limits
+        groups: List[List[str]] = []
+        group_tokens = 0
+        for content in contents:
+            tokens = estimate_tokens(content)
+            if not groups or len(groups[-1]) >= AI_BATCH_MAX_ITEMS or group_tokens + tokens > AI_BATCH_MAX_PROMPT_TOKENS:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(content)
+            group_tokens += tokens
+        
+        results = await asyncio.gather(*(self._classify_group_with_ai(group) for group in groups))
+        return [result for group_results in results for result in group_results]
+    
+    async def _classify_group_with_ai(self, contents: List[str]) -> List[Dict[str, Any]]:
+        """Classify a group of inputs with a single numbered prompt"""
+        if len(contents) == 1:
+            return [await self._classify_with_ai(contents[0])]
+        
+        try:
+            numbered = "\n".join(f"{index}. {content}" for index, content in enumerate(contents, 1))
             
-            client = OpenAI(api_key=self.openai_key)
+            result = await openai_limiter.call(
+                _CLASSIFY_BATCH_SYSTEM_TOKENS + estimate_tokens(numbered) + CLASSIFICATION_RESPONSE_TOKENS * len(contents),
+                lambda: stream_json_completion(
+                    self._aclient,
+                    model=settings.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": _CLASSIFY_BATCH_SYSTEM_PROMPT},
+                        {"role": "user", "content": numbered}
+                    ],
+                    tools=[_CLASSIFY_BATCH_TOOL],
+                    tool_choice={"type": "function", "function": {"name": "classify_batch"}},
+                    temperature=0.2,
+                ),
+            )
             
-            prompt = f"""
-Analyze the following emergency situation and classify it into one of these categories:
-- medical
-- trauma
-- cardiac
-- respiratory
-- burn
-- poisoning
-- fracture
-- bleeding
-- unknown
-
-Emergency description: {content}
-
-Respond ONLY in JSON:
-{{
-    "type": "category_name",
-    "confidence": 0.0,
-    "reasoning": "short explanation"
-}}
-"""
+            # Align results by index; anything missing falls back to rules
+            by_index = {}
+            for item in result.get("results", []):
+                try:
+                    by_index[int(item["index"])] = item
+                except (KeyError, TypeError, ValueError):
+                    continue
             
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are an emergency medical classification AI."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.2,
-            )
+            classifications = []
+            for index, content in enumerate(contents, 1):
+                if index in by_index:
+                    classifications.append(self._normalize_ai_result(by_index[index]))
+                else:
+                    classifications.append(await self._classify_with_rules(content))
+            return classifications
             
-            result = json.loads(response.choices[0].message.content)
-
-            # Normalize + validate
-            emergency_type = result.get("type", "unknown").lower()
-            if emergency_type not in [e.value for e in EmergencyType]:
-                emergency_type = "unknown"
-
-            return {
-                "type": emergency_type,
-                "confidence": float(result.get("confidence", 0.7)),
-                "reasoning": result.get("reasoning", "AI classification"),
-                "source": "ai"
-            }
-
         except Exception as e:
-            logger.warning(f"AI classification failed: {str(e)}, falling back to rules")
-            return await self._classify_with_rules(content)
+            logger.warning("Batched AI classification failed: %s, falling back to rules", e)
+            return [await self._classify_with_rules(content) for content in contents]
+    
+    def _normalize_ai_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize and validate one AI classification"""
+        emergency_type = str(result.get("type", "unknown")).lower()
+        if emergency_type not in _VALID_EMERGENCY_TYPES:
+            emergency_type = "unknown"
+
+        return {
+            "type": emergency_type,
+            "confidence": float(result.get("confidence", 0.7)),
+            "reasoning": result.get("reasoning", "AI classification"),
+            "source": "ai"
+        }
     
     async def _classify_with_rules(self, content: str) -> Dict[str, Any]:
         """Rule-based classification fallback"""
-        content_lower = content.lower()
-        
-        keywords = {
-            "cuts-wounds": ["cut", "wound", "bleeding", "blood", "gash", "laceration", "scrape"],
-            "burns": ["burn", "scald", "fire", "hot", "steam", "chemical burn"],
-            "choking": ["choking", "can't breathe", "swallowed", "stuck in throat", "gagging"],
-            "cpr": ["unconscious", "not breathing", "no pulse", "cardiac arrest", "collapsed"],
-            "sprains": ["sprain", "twisted", "ankle", "wrist", "swollen", "can't move"],
-            "nosebleed": ["nosebleed", "nose bleeding", "bloody nose"],
-            "allergic-reaction": ["allergic", "rash", "hives", "swelling", "itchy", "reaction"],
-            "fainting": ["fainted", "dizzy", "lightheaded", "passed out", "unconscious"],
+        # Distinct keywords per type, found in a single regex scan
+        counts = Counter(
+            emergency_type
+            for keyword in _KEYWORD_MATCHER.find(content)
+            for emergency_type in _KEYWORD_TYPES[keyword]
+        )
+        scores = {
+            emergency_type: counts[emergency_type]
+            for emergency_type in RULE_KEYWORDS
+            if counts[emergency_type]
         }
         
-        scores = {}
-        for emergency_type, keyword_list in keywords.items():
-            score = sum(1 for keyword in keyword_list if keyword in content_lower)
-            if score > 0:
-                scores[emergency_type] = score
-        
         if scores:
             emergency_type = max(scores, key=scores.get)
             confidence = min(0.9, 0.5 + (scores[emergency_type] * 0.1))
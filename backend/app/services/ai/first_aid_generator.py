@@ -3,15 +3,323 @@ LIFELINE AI - First Aid Instruction Generator
 Generate step-by-step first aid instructions
 """
 
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import AsyncIterator, List, Dict, Any, Mapping, Tuple
+import asyncio
 import logging
-import uuid
+import secrets
+import orjson
 
-from app.models.schemas import FirstAidInstruction
+from app.models.schemas import EmergencyType, FirstAidInstruction
 from app.core.config import settings
+from app.services.ai.openai_client import get_openai_client, stream_json_array_items
+from app.services.ai.rate_limiter import estimate_tokens, openai_limiter
+from app.services.location.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Distinct (emergency_type, severity, model) keys kept in the instruction cache
+INSTRUCTION_CACHE_SIZE = 64
+
+# Token allowance reserved for each generated instruction list
+INSTRUCTION_RESPONSE_TOKENS = 800
+
+# Queued after the last streamed step once the completion has finished
+_STREAM_END = object()
+
+# Function-calling schema matching FirstAidInstruction (ids are added locally)
+_INSTRUCTIONS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "submit_instructions",
+        "description": "Record the first aid steps in order",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "instructions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "step": {"type": "integer", "minimum": 1},
+                            "title": {"type": "string"},
+                            "description": {"type": "string"},
+                            "duration": {"type": "integer", "minimum": 0, "description": "seconds"},
+                        },
+                        "required": ["step", "title", "description"],
+                    },
+                },
+            },
+            "required": ["instructions"],
+        },
+    },
+}
+
+# Static part of the generation prompt, kept as an identical system-message
+# prefix so it can be served from the server-side prompt cache
+_INSTRUCTIONS_SYSTEM_PROMPT = """You are a first aid instruction generator. Provide clear, accurate, and actionable first aid steps
+that a layperson can follow. Include:
+- Immediate actions to take
+- What NOT to do
+- When to call emergency services
+- How to monitor the situation"""
+
+# Template steps per first aid category
+INSTRUCTION_TEMPLATES: Mapping[str, Tuple[Dict[str, Any], ...]] = MappingProxyType({
+    "cuts-wounds": (
+        {
+            "title": "Stop the Bleeding",
+            "description": "Apply direct pressure to the wound with a clean cloth or bandage. Press firmly and continuously.",
+            "duration": 300,
+        },
+        {
+            "title": "Clean the Wound",
+            "description": "Once bleeding stops, gently clean the wound with clean water. Remove any visible debris.",
+            "duration": 120,
+        },
+        {
+            "title": "Apply Bandage",
+            "description": "Cover the wound with a sterile bandage or clean cloth. Secure with tape or wrap.",
+            "duration": 60,
+        },
+        {
+            "title": "Monitor for Infection",
+            "description": "Watch for signs of infection: increased pain, redness, swelling, or pus. Seek medical attention if needed.",
+            "duration": 0,
+        },
+    ),
+    "burns": (
+        {
+            "title": "Cool the Burn",
+            "description": "Hold the burned area under cool (not cold) running water for 10-20 minutes.",
+            "duration": 1200,
+        },
+        {
+            "title": "Remove Tight Items",
+            "description": "Remove rings, bracelets, or tight clothing from the burned area before it swells.",
+            "duration": 30,
+        },
+        {
+            "title": "Cover the Burn",
+            "description": "Cover with a sterile, non-adhesive bandage or clean cloth. Do not use ice or butter.",
+            "duration": 60,
+        },
+        {
+            "title": "Seek Medical Attention",
+            "description": "For severe burns or burns larger than 3 inches, call emergency services immediately.",
+            "duration": 0,
+        },
+    ),
+    "choking": (
+        {
+            "title": "Encourage Coughing",
+            "description": "If the person can cough, encourage them to keep coughing to try to clear the blockage.",
+            "duration": 30,
+        },
+        {
+            "title": "Back Blows",
+            "description": "Stand behind the person, lean them forward, and give 5 sharp back blows between the shoulder blades.",
+            "duration": 30,
+        },
+        {
+            "title": "Abdominal Thrusts",
+            "description": "Stand behind the person, place hands above navel, and give 5 quick upward thrusts.",
+            "duration": 30,
+        },
+        {
+            "title": "Call Emergency Services",
+            "description": "If the blockage doesn't clear, call 911 immediately and continue alternating back blows and thrusts.",
+            "duration": 0,
+        },
+    ),
+    "cpr": (
+        {
+            "title": "Check Responsiveness",
+            "description": "Tap the person's shoulders and shout 'Are you okay?' Check for normal breathing.",
+            "duration": 10,
+        },
+        {
+            "title": "Call for Help",
+            "description": "Call 911 immediately. Ask someone to find an AED if available.",
+            "duration": 0,
+        },
+        {
+            "title": "Position Hands",
+            "description": "Place heel of one hand on center of chest between nipples. Place other hand on top, interlacing fingers.",
+            "duration": 15,
+        },
+        {
+            "title": "Start Compressions",
+            "description": "Push hard and fast at least 2 inches deep at 100-120 compressions per minute. Let chest recoil completely.",
+            "duration": 120,
+        },
+    ),
+    "sprains": (
+        {
+            "title": "Rest the Injury",
+            "description": "Stop activity and rest the injured area. Avoid putting weight on it.",
+            "duration": 0,
+        },
+        {
+            "title": "Apply Ice",
+            "description": "Apply ice wrapped in a cloth for 15-20 minutes every 2-3 hours for the first 48 hours.",
+            "duration": 1200,
+        },
+        {
+            "title": "Compress the Area",
+            "description": "Wrap with an elastic bandage, not too tight. You should be able to slip a finger under it.",
+            "duration": 120,
+        },
+        {
+            "title": "Elevate if Possible",
+            "description": "Raise the injured area above heart level when resting to reduce swelling.",
+            "duration": 0,
+        },
+    ),
+    "nosebleed": (
+        {
+            "title": "Sit and Lean Forward",
+            "description": "Sit upright and lean slightly forward to prevent blood from running down the throat.",
+            "duration": 0,
+        },
+        {
+            "title": "Pinch the Nose",
+            "description": "Pinch the soft part of the nose (not the bridge) firmly for 10-15 minutes continuously.",
+            "duration": 900,
+        },
+        {
+            "title": "Apply Cold Compress",
+            "description": "Apply a cold compress or ice pack to the bridge of the nose while pinching.",
+            "duration": 900,
+        },
+        {
+            "title": "Seek Help if Needed",
+            "description": "If bleeding doesn't stop after 20 minutes or if caused by injury, seek medical attention.",
+            "duration": 0,
+        },
+    ),
+    "allergic-reaction": (
+        {
+            "title": "Remove the Trigger",
+            "description": "If possible, remove or avoid the allergen that caused the reaction.",
+            "duration": 30,
+        },
+        {
+            "title": "Use Antihistamine",
+            "description": "Give an antihistamine like Benadryl if available and the person is conscious.",
+            "duration": 60,
+        },
+        {
+            "title": "Watch for Severe Symptoms",
+            "description": "Monitor for difficulty breathing, swelling of face/throat, or rapid pulse.",
+            "duration": 0,
+        },
+        {
+            "title": "Call Emergency Services",
+            "description": "If symptoms are severe or person has an EpiPen, use it and call 911 immediately.",
+            "duration": 0,
+        },
+    ),
+    "fainting": (
+        {
+            "title": "Lay Person Down",
+            "description": "Help the person lie down on their back. If not possible, help them sit with head between knees.",
+            "duration": 30,
+        },
+        {
+            "title": "Elevate Legs",
+            "description": "Raise the person's legs 8-12 inches above heart level to improve blood flow to the brain.",
+            "duration": 0,
+        },
+        {
+            "title": "Loosen Tight Clothing",
+            "description": "Loosen belts, collars, or any tight clothing around the neck and waist.",
+            "duration": 30,
+        },
+        {
+            "title": "Monitor and Reassure",
+            "description": "Stay with the person, check breathing, and provide reassurance when they regain consciousness.",
+            "duration": 0,
+        },
+    ),
+})
+
+# Used when no template exists for the emergency type
+DEFAULT_INSTRUCTIONS: Tuple[Dict[str, Any], ...] = (
+    {
+        "title": "Assess the Situation",
+        "description": "Carefully assess the situation and ensure your own safety first.",
+        "duration": 30,
+    },
+    {
+        "title": "Call for Help",
+        "description": "Call 911 or your local emergency number if the situation is serious.",
+        "duration": 0,
+    },
+    {
+        "title": "Provide Basic Care",
+        "description": "Provide basic first aid care while waiting for professional help to arrive.",
+        "duration": 0,
+    },
+    {
+        "title": "Monitor the Person",
+        "description": "Continue monitoring the person's condition and stay with them until help arrives.",
+        "duration": 0,
+    },
+)
+
+
+def _prebuild(name: str, steps: Tuple[Dict[str, Any], ...]) -> Tuple[FirstAidInstruction, ...]:
+    """Validate template steps into shareable (frozen) instructions"""
+    return tuple(
+        FirstAidInstruction(
+            id=f"{name}-{idx}",
+            step=idx,
+            title=instruction["title"],
+            description=instruction["description"],
+            duration=instruction.get("duration"),
+        )
+        for idx, instruction in enumerate(steps, 1)
+    )
+
+
+# Curated template per type, sent as context so the model adapts known-good
+# steps instead of writing them from scratch. One fixed message per type
+# keeps the prompt prefix identical across requests for that type
+_TEMPLATE_CONTEXT: Mapping[str, str] = MappingProxyType({
+    emergency_type: (
+        "Base template (curated steps for this emergency type): "
+        + orjson.dumps(list(steps)).decode()
+        + "\nAdapt it to the requested severity, adding or removing caveats as needed, "
+        "and return the steps in the same schema."
+    )
+    for emergency_type, steps in INSTRUCTION_TEMPLATES.items()
+})
+
+# Template for each classifier EmergencyType, used for the AI context and
+# the template steps; template names (as returned by the custom model)
+# map to themselves
+_TEMPLATE_FOR_TYPE: Mapping[str, str] = MappingProxyType({
+    EmergencyType.BURN.value: "burns",
+    EmergencyType.BLEEDING.value: "cuts-wounds",
+    EmergencyType.TRAUMA.value: "cuts-wounds",
+    EmergencyType.CARDIAC.value: "cpr",
+    EmergencyType.RESPIRATORY.value: "choking",
+    EmergencyType.FRACTURE.value: "sprains",
+    **{name: name for name in INSTRUCTION_TEMPLATES},
+})
+
+# Read-only view so the shared instructions can't be swapped out at runtime
+_PREBUILT_TEMPLATES: Mapping[str, Tuple[FirstAidInstruction, ...]] = MappingProxyType({
+    emergency_type: _prebuild(emergency_type, steps) for emergency_type, steps in INSTRUCTION_TEMPLATES.items()
+})
+_PREBUILT_DEFAULT = _prebuild("default", DEFAULT_INSTRUCTIONS)
+
+
+def _template_steps(emergency_type: str) -> Tuple[FirstAidInstruction, ...]:
+    """Shared prebuilt steps for a type (the default set for types without a template)"""
+    return _PREBUILT_TEMPLATES.get(_TEMPLATE_FOR_TYPE.get(emergency_type, ""), _PREBUILT_DEFAULT)
+
 
 class FirstAidGenerator:
     """Generate first aid instructions for emergencies"""
@@ -19,12 +327,24 @@ class FirstAidGenerator:
     def __init__(self):
         self.ai_enabled = settings.AI_ENABLED
         self.openai_key = settings.OPENAI_API_KEY
+        # AI instructions per (emergency_type, severity, model); only successful
+        # generations are stored, so a failed call is retried next time
+        self._instruction_cache = TTLCache(
+            maxsize=INSTRUCTION_CACHE_SIZE,
+            ttl=settings.INSTRUCTION_CACHE_TTL_SECONDS,
+        )
+        self._aclient = get_openai_client()
         
+    @property
+    def uses_severity(self) -> bool:
+        """Whether instructions can differ by severity (templates never do)"""
+        return self._aclient is not None
+    
     async def generate_instructions(
         self,
         emergency_type: str,
         severity: str
-    ) -> List[Dict[str, Any]]:
+    ) -> List[FirstAidInstruction]:
         """
         Generate first aid instructions
         
@@ -33,299 +353,163 @@ class FirstAidGenerator:
             severity: Severity level
             
         Returns:
-            List of first aid instruction dictionaries
+            List of first aid instructions
+        """
+        # Template instructions are prebuilt; only AI output needs the cache
+        if self._aclient is None:
+            return await self._generate_with_templates(emergency_type, severity)
+        
+        cached = self._instruction_cache.get((emergency_type, severity, settings.OPENAI_MODEL))
+        if cached is None:
+            return await self._build_instructions(emergency_type, severity)
+        
+        # Instructions are frozen models, so the cached steps can be shared
+        return list(cached)
+    
+    async def stream_instructions(
+        self,
+        emergency_type: str,
+        severity: str
+    ) -> AsyncIterator[FirstAidInstruction]:
         """
+        Yield first aid instructions one at a time, as soon as each is ready
+        
+        Cached and template instructions are yielded immediately; AI steps
+        are yielded while the rest of the response is still generating. If
+        the AI stream fails before its first step, template steps are
+        yielded instead; after that, the error is raised so the partial
+        list is not taken as complete.
+        """
+        cached = None
+        if self._aclient is not None:
+            cached = self._instruction_cache.get((emergency_type, severity, settings.OPENAI_MODEL))
+        if self._aclient is None or cached is not None:
+            for instruction in cached or _template_steps(emergency_type):
+                yield instruction
+            return
+        
+        yielded = False
         try:
-            if self.ai_enabled and self.openai_key:
+            async for instruction in self._stream_with_ai(emergency_type, severity):
+                yielded = True
+                yield instruction
+        except Exception as e:
+            logger.warning("AI instruction streaming failed: %s", e)
+            # Steps already sent can't be replaced; otherwise fall back to templates
+            if yielded:
+                raise
+            for instruction in _template_steps(emergency_type):
+                yield instruction
+    
+    async def _build_instructions(
+        self,
+        emergency_type: str,
+        severity: str
+    ) -> List[FirstAidInstruction]:
+        """Generate instructions with AI, falling back to templates"""
+        try:
+            if self._aclient is not None:
                 return await self._generate_with_ai(emergency_type, severity)
             else:
                 return await self._generate_with_templates(emergency_type, severity)
                 
         except Exception as e:
-            logger.error(f"Instruction generation error: {str(e)}")
+            logger.error("Instruction generation error: %s", e)
             return await self._generate_with_templates(emergency_type, severity)
     
     async def _generate_with_ai(
         self,
         emergency_type: str,
         severity: str
-    ) -> List[Dict[str, Any]]:
+    ) -> List[FirstAidInstruction]:
         """Generate instructions using AI/LLM"""
         try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=self.openai_key)
-            
-            prompt = f"""Generate step-by-step first aid instructions for a {severity} {emergency_type} emergency.
-
-Provide clear, actionable steps that a layperson can follow. Include:
-- Immediate actions to take
-- What NOT to do
-- When to call emergency services
-- How to monitor the situation
-
-Respond in JSON format with an array of instructions:
-{{
-    "instructions": [
-        {{
-            "step": 1,
-            "title": "Step title",
-            "description": "Detailed step description",
-            "duration": 30
-        }},
-        ...
-    ]
-}}"""
-            
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a first aid instruction generator. Provide clear, accurate, and actionable first aid steps."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.4,
-            )
-            
-            import json
-            result = json.loads(response.choices[0].message.content)
-            instructions = result.get("instructions", [])
-            
-            # Convert to FirstAidInstruction format
-            formatted_instructions = []
-            for idx, instruction in enumerate(instructions, 1):
-                formatted_instructions.append({
-                    "id": str(uuid.uuid4()),
-                    "step": instruction.get("step", idx),
-                    "title": instruction.get("title", f"Step {idx}"),
-                    "description": instruction.get("description", ""),
-                    "duration": instruction.get("duration"),
-                })
-            
-            return formatted_instructions
+            return [
+                instruction async for instruction in self._stream_with_ai(emergency_type, severity)
+            ]
             
         except Exception as e:
-            logger.warning(f"AI instruction generation failed: {str(e)}, falling back to templates")
+            logger.warning("AI instruction generation failed: %s, falling back to templates", e)
             return await self._generate_with_templates(emergency_type, severity)
     
-    async def _generate_with_templates(
+    async def _stream_with_ai(
         self,
         emergency_type: str,
         severity: str
-    ) -> List[Dict[str, Any]]:
-        """Generate instructions from templates"""
-        templates = {
-            "cuts-wounds": [
-                {
-                    "title": "Stop the Bleeding",
-                    "description": "Apply direct pressure to the wound with a clean cloth or bandage. Press firmly and continuously.",
-                    "duration": 300,
-                },
-                {
-                    "title": "Clean the Wound",
-                    "description": "Once bleeding stops, gently clean the wound with clean water. Remove any visible debris.",
-                    "duration": 120,
-                },
-                {
-                    "title": "Apply Bandage",
-                    "description": "Cover the wound with a sterile bandage or clean cloth. Secure with tape or wrap.",
-                    "duration": 60,
-                },
-                {
-                    "title": "Monitor for Infection",
-                    "description": "Watch for signs of infection: increased pain, redness, swelling, or pus. Seek medical attention if needed.",
-                    "duration": 0,
-                },
-            ],
-            "burns": [
-                {
-                    "title": "Cool the Burn",
-                    "description": "Hold the burned area under cool (not cold) running water for 10-20 minutes.",
-                    "duration": 1200,
-                },
-                {
-                    "title": "Remove Tight Items",
-                    "description": "Remove rings, bracelets, or tight clothing from the burned area before it swells.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Cover the Burn",
-                    "description": "Cover with a sterile, non-adhesive bandage or clean cloth. Do not use ice or butter.",
-                    "duration": 60,
-                },
-                {
-                    "title": "Seek Medical Attention",
-                    "description": "For severe burns or burns larger than 3 inches, call emergency services immediately.",
-                    "duration": 0,
-                },
-            ],
-            "choking": [
-                {
-                    "title": "Encourage Coughing",
-                    "description": "If the person can cough, encourage them to keep coughing to try to clear the blockage.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Back Blows",
-                    "description": "Stand behind the person, lean them forward, and give 5 sharp back blows between the shoulder blades.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Abdominal Thrusts",
-                    "description": "Stand behind the person, place hands above navel, and give 5 quick upward thrusts.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Call Emergency Services",
-                    "description": "If the blockage doesn't clear, call 911 immediately and continue alternating back blows and thrusts.",
-                    "duration": 0,
-                },
-            ],
-            "cpr": [
-                {
-                    "title": "Check Responsiveness",
-                    "description": "Tap the person's shoulders and shout 'Are you okay?' Check for normal breathing.",
-                    "duration": 10,
-                },
-                {
-                    "title": "Call for Help",
-                    "description": "Call 911 immediately. Ask someone to find an AED if available.",
-                    "duration": 0,
-                },
-                {
-                    "title": "Position Hands",
-                    "description": "Place heel of one hand on center of chest between nipples. Place other hand on top, interlacing fingers.",
-                    "duration": 15,
-                },
-                {
-                    "title": "Start Compressions",
-                    "description": "Push hard and fast at least 2 inches deep at 100-120 compressions per minute. Let chest recoil completely.",
-                    "duration": 120,
-                },
-            ],
-            "sprains": [
-                {
-                    "title": "Rest the Injury",
-                    "description": "Stop activity and rest the injured area. Avoid putting weight on it.",
-                    "duration": 0,
-                },
-                {
-                    "title": "Apply Ice",
-                    "description": "Apply ice wrapped in a cloth for 15-20 minutes every 2-3 hours for the first 48 hours.",
-                    "duration": 1200,
-                },
-                {
-                    "title": "Compress the Area",
-                    "description": "Wrap with an elastic bandage, not too tight. You should be able to slip a finger under it.",
-                    "duration": 120,
-                },
-                {
-                    "title": "Elevate if Possible",
-                    "description": "Raise the injured area above heart level when resting to reduce swelling.",
-                    "duration": 0,
-                },
-            ],
-            "nosebleed": [
-                {
-                    "title": "Sit and Lean Forward",
-                    "description": "Sit upright and lean slightly forward to prevent blood from running down the throat.",
-                    "duration": 0,
-                },
-                {
-                    "title": "Pinch the Nose",
-                    "description": "Pinch the soft part of the nose (not the bridge) firmly for 10-15 minutes continuously.",
-                    "duration": 900,
-                },
-                {
-                    "title": "Apply Cold Compress",
-                    "description": "Apply a cold compress or ice pack to the bridge of the nose while pinching.",
-                    "duration": 900,
-                },
-                {
-                    "title": "Seek Help if Needed",
-                    "description": "If bleeding doesn't stop after 20 minutes or if caused by injury, seek medical attention.",
-                    "duration": 0,
-                },
-            ],
-            "allergic-reaction": [
-                {
-                    "title": "Remove the Trigger",
-                    "description": "If possible, remove or avoid the allergen that caused the reaction.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Use Antihistamine",
-                    "description": "Give an antihistamine like Benadryl if available and the person is conscious.",
-                    "duration": 60,
-                },
-                {
-                    "title": "Watch for Severe Symptoms",
-                    "description": "Monitor for difficulty breathing, swelling of face/throat, or rapid pulse.",
-                    "duration": 0,
-                },
-                {
-                    "title": "Call Emergency Services",
-                    "description": "If symptoms are severe or person has an EpiPen, use it and call 911 immediately.",
-                    "duration": 0,
-                },
-            ],
-            "fainting": [
-                {
-                    "title": "Lay Person Down",
-                    "description": "Help the person lie down on their back. If not possible, help them sit with head between knees.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Elevate Legs",
-                    "description": "Raise the person's legs 8-12 inches above heart level to improve blood flow to the brain.",
-                    "duration": 0,
-                },
-                {
-                    "title": "Loosen Tight Clothing",
-                    "description": "Loosen belts, collars, or any tight clothing around the neck and waist.",
-                    "duration": 30,
-                },
-                {
-                    "title": "Monitor and Reassure",
-                    "description": "Stay with the person, check breathing, and provide reassurance when they regain consciousness.",
-                    "duration": 0,
-                },
-            ],
-        }
+    ) -> AsyncIterator[FirstAidInstruction]:
+        """
+        Stream AI instructions, validating each step as it arrives
         
-        # Get template or use default
-        instructions = templates.get(emergency_type, [
-            {
-                "title": "Assess the Situation",
-                "description": "Carefully assess the situation and ensure your own safety first.",
-                "duration": 30,
-            },
-            {
-                "title": "Call for Help",
-                "description": "Call 911 or your local emergency number if the situation is serious.",
-                "duration": 0,
-            },
-            {
-                "title": "Provide Basic Care",
-                "description": "Provide basic first aid care while waiting for professional help to arrive.",
-                "duration": 0,
-            },
-            {
-                "title": "Monitor the Person",
-                "description": "Continue monitoring the person's condition and stay with them until help arrives.",
-                "duration": 0,
-            },
-        ])
+        The completion is read by a separate task into a queue, so the
+        limiter slot is released as soon as OpenAI finishes rather than
+        when a slow consumer has read every step.
+        """
+        prompt = f"Generate step-by-step first aid instructions for a {severity} {emergency_type} emergency."
+        
+        messages = [{"role": "system", "content": _INSTRUCTIONS_SYSTEM_PROMPT}]
+        context = _TEMPLATE_CONTEXT.get(_TEMPLATE_FOR_TYPE.get(emergency_type, ""))
+        if context is not None:
+            messages.append({"role": "system", "content": context})
+        messages.append({"role": "user", "content": prompt})
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        
+        # One random id per generation; steps are suffixed with their index
+        generation_id = secrets.token_hex(16)
+        steps: List[FirstAidInstruction] = []
         
-        # Format instructions
-        formatted = []
-        for idx, instruction in enumerate(instructions, 1):
-            formatted.append({
-                "id": str(uuid.uuid4()),
-                "step": idx,
-                "title": instruction["title"],
-                "description": instruction["description"],
-                "duration": instruction.get("duration"),
-            })
+        # Parsed step dicts, then _STREAM_END or the exception that ended the stream
+        received: asyncio.Queue = asyncio.Queue()
         
-        return formatted
+        async def receive():
+            try:
+                async with openai_limiter.limit(prompt_tokens + INSTRUCTION_RESPONSE_TOKENS):
+                    async for item in stream_json_array_items(
+                        self._aclient,
+                        model=settings.OPENAI_MODEL,
+                        messages=messages,
+                        tools=[_INSTRUCTIONS_TOOL],
+                        tool_choice={"type": "function", "function": {"name": "submit_instructions"}},
+                        temperature=0.4,
+                    ):
+                        received.put_nowait(item)
+            except Exception as e:
+                received.put_nowait(e)
+            else:
+                received.put_nowait(_STREAM_END)
+        
+        receiver = asyncio.create_task(receive())
+        try:
+            while True:
+                instruction = await received.get()
+                if instruction is _STREAM_END:
+                    break
+                if isinstance(instruction, Exception):
+                    raise instruction
+                
+                # The parsed dict already follows the schema; complete it in place
+                idx = len(steps) + 1
+                instruction["id"] = f"{generation_id}-{idx}"
+                instruction.setdefault("step", idx)
+                instruction.setdefault("title", f"Step {idx}")
+                instruction.setdefault("description", "")
+                
+                step = FirstAidInstruction.model_validate(instruction)
+                steps.append(step)
+                yield step
+        finally:
+            # The consumer stopped early or a step was invalid
+            receiver.cancel()
+        
+        if not steps:
+            raise ValueError("no instructions returned")
+        
+        self._instruction_cache.set((emergency_type, severity, settings.OPENAI_MODEL), tuple(steps))
+    
+    async def _generate_with_templates(
+        self,
+        emergency_type: str,
+        severity: str
+    ) -> List[FirstAidInstruction]:
+        """Generate instructions from templates"""
+        # Templates don't vary by severity and were validated at import
+        return list(_template_steps(emergency_type))
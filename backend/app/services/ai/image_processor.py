@@ -3,14 +3,63 @@ LIFELINE AI - Image Processing Service
 Image analysis and description generation
 """
 
+import asyncio
 import base64
 import io
 import logging
 
+from typing import Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; images are then sent unchanged
+    Image = None
+
 from app.core.config import settings
+from app.services.ai.openai_client import get_openai_client
+from app.services.ai.rate_limiter import openai_limiter
 
 logger = logging.getLogger(__name__)
 
+# Approximate token cost of one vision call (prompt, image tiles, reply)
+VISION_REQUEST_TOKENS = 1500
+
+# Base64 payloads below this size (~150KB images) are sent without resizing
+RESIZE_MIN_CHARS = 200_000
+
+# Static persona and instruction come before the image, so every request
+# shares the same cacheable prompt prefix
+_VISION_SYSTEM_PROMPT = "You are an emergency medical image analysis AI. Analyze images of medical emergencies and describe what you see in detail, focusing on visible injuries, symptoms, or emergency situations."
+
+_VISION_USER_TEXT = "Analyze this emergency medical image. Describe what you see, including any visible injuries, symptoms, or emergency situations. Be specific and detailed."
+
+
+def _prepare_image(image_data: str, format: str) -> Tuple[str, str]:
+    """
+    Verify the image and downscale large ones for the vision call (CPU-bound)
+    
+    Returns the base64 payload and format to send, which are the inputs
+    unchanged unless the image was re-encoded as JPEG.
+    """
+    image_bytes = base64.b64decode(image_data)
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.verify()
+    
+    if len(image_data) < RESIZE_MIN_CHARS:
+        return image_data, format
+    
+    # verify() leaves the image unusable, so decode it again to resize
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if max(image.size) <= settings.IMAGE_MAX_DIMENSION:
+            return image_data, format
+        
+        resized = ImageOps.exif_transpose(image).convert("RGB")
+        resized.thumbnail((settings.IMAGE_MAX_DIMENSION, settings.IMAGE_MAX_DIMENSION), Image.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, format="JPEG", quality=settings.IMAGE_JPEG_QUALITY)
+    
+    return base64.b64encode(output.getvalue()).decode("ascii"), "jpeg"
+
 
 class ImageProcessor:
     """Process image input and generate descriptions"""
@@ -18,6 +67,7 @@ class ImageProcessor:
     def __init__(self):
         self.ai_enabled = settings.AI_ENABLED
         self.openai_key = settings.OPENAI_API_KEY
+        self._aclient = get_openai_client()
         
     async def analyze(
         self,
@@ -35,7 +85,7 @@ class ImageProcessor:
             Image description text
         """
         try:
-            if self.ai_enabled and self.openai_key:
+            if self._aclient is not None:
                 return await self._analyze_with_ai(image_data, format)
             else:
                 # Fallback: return placeholder
@@ -43,7 +93,7 @@ class ImageProcessor:
                 return "Image received. Please provide text description of the emergency situation shown in the image."
                 
         except Exception as e:
-            logger.error(f"Image analysis error: {str(e)}")
+            logger.error("Image analysis error: %s", e)
             return "Unable to process image. Please provide a text description of the emergency."
     
     async def _analyze_with_ai(
@@ -53,45 +103,47 @@ class ImageProcessor:
     ) -> str:
         """Analyze image using OpenAI Vision API"""
         try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=self.openai_key)
-            
-            # Decode base64 image
-            image_bytes = base64.b64decode(image_data)
+            # Decoding, verifying and resizing take tens of ms for large
+            # photos, so they run in a worker thread instead of the event loop
+            if Image is not None:
+                image_data, format = await asyncio.to_thread(_prepare_image, image_data, format)
             
-            # Prepare image for API
             image_url = f"data:image/{format};base64,{image_data}"
             
             # Analyze with GPT-4 Vision
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an emergency medical image analysis AI. Analyze images of medical emergencies and describe what you see in detail, focusing on visible injuries, symptoms, or emergency situations."
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Analyze this emergency medical image. Describe what you see, including any visible injuries, symptoms, or emergency situations. Be specific and detailed."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url
+            response = await openai_limiter.call(
+                VISION_REQUEST_TOKENS,
+                lambda: self._aclient.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": _VISION_SYSTEM_PROMPT
+                        },
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": _VISION_USER_TEXT
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": image_url,
+                                        "detail": settings.OPENAI_IMAGE_DETAIL
+                                    }
                                 }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500,
+                            ]
+                        }
+                    ],
+                    max_tokens=500,
+                    timeout=settings.OPENAI_MEDIA_TIMEOUT_SECONDS,
+                ),
             )
             
             return response.choices[0].message.content
             
         except Exception as e:
-            logger.error(f"OpenAI image analysis error: {str(e)}")
+            logger.error("OpenAI image analysis error: %s", e)
             raise Exception(f"Image analysis failed: {str(e)}")
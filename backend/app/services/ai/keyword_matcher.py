@@ -0,0 +1,39 @@
+"""
+LIFELINE AI - Keyword Matcher
+Single-pass keyword detection for the rule-based fallbacks
+"""
+
+from typing import FrozenSet, Iterable, Set, Tuple
+import re
+
+
+class KeywordMatcher:
+    """
+    Find which of a fixed set of ASCII keywords occur in a text.
+
+    A zero-width lookahead reports a keyword at every position in one regex
+    pass; alternatives are tried longest first, and each match also counts
+    the keywords it contains, so shorter keywords starting at the same
+    position are not lost. ASCII case-insensitive matching equals lowercasing
+    the input first, without copying it.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        ordered = sorted(set(keywords), key=len, reverse=True)
+        # One capture group per keyword: match.lastindex names the keyword,
+        # so matched text is never sliced out or lowercased
+        self._pattern = re.compile(
+            "(?=(?:" + "|".join(f"({re.escape(keyword)})" for keyword in ordered) + "))",
+            re.IGNORECASE | re.ASCII,
+        )
+        self._contained: Tuple[FrozenSet[str], ...] = (frozenset(),) + tuple(
+            frozenset(other for other in ordered if other in keyword)
+            for keyword in ordered
+        )
+
+    def find(self, text: str) -> Set[str]:
+        """Distinct keywords present in text"""
+        found: Set[str] = set()
+        for match in self._pattern.finditer(text):
+            found |= self._contained[match.lastindex]
+        return found
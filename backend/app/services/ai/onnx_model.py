@@ -0,0 +1,112 @@
+"""
+LIFELINE AI - ONNX Model
+Serve the trained pipelines through onnxruntime, and export them for it
+"""
+
+from typing import Any, List, Optional
+import json
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Metadata key holding the JSON list of class labels, in probability column order
+CLASSES_METADATA_KEY = "classes"
+
+# Largest difference from the sklearn probabilities an exported graph may show
+EXPORT_TOLERANCE = 1e-4
+
+
+class OnnxPipeline:
+    """
+    TF-IDF + classifier graph executed by onnxruntime, exposing the
+    predict_proba / classes_ interface of the sklearn pipeline it replaces.
+    The session runs outside the GIL and is safe to share between threads.
+    """
+
+    def __init__(self, session: Any, classes: np.ndarray):
+        self.session = session
+        self.classes_ = classes
+        self._input_name = session.get_inputs()[0].name
+        # Output 0 is the predicted label, output 1 the probability matrix
+        self._proba_name = session.get_outputs()[1].name
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Class probabilities, one row per text"""
+        inputs = np.array(texts, dtype=object).reshape(-1, 1)
+        return self.session.run([self._proba_name], {self._input_name: inputs})[0]
+
+
+def load_onnx_pipeline(path: str) -> Optional[OnnxPipeline]:
+    """Load an exported pipeline; None when onnxruntime or the file is unusable"""
+    try:
+        import onnxruntime
+    except ImportError:
+        return None
+
+    try:
+        session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        metadata = session.get_modelmeta().custom_metadata_map
+        classes = np.array(json.loads(metadata[CLASSES_METADATA_KEY]))
+        return OnnxPipeline(session, classes)
+    except Exception as e:
+        logger.warning("ONNX model %s not loaded: %s", path, e)
+        return None
+
+
+def export_onnx_pipeline(pipeline: Any, path: str, texts: List[str]) -> bool:
+    """
+    Convert a fitted sklearn text pipeline to ONNX (needs skl2onnx and
+    onnxruntime)
+
+    The graph tokenizes text itself, so it is only written when its
+    probabilities for texts match pipeline.predict_proba; otherwise any
+    earlier export at path is removed, so a stale graph is never served.
+    """
+    try:
+        from skl2onnx import to_onnx
+        from skl2onnx.common.data_types import StringTensorType
+        import onnxruntime
+    except ImportError:
+        logger.warning("skl2onnx or onnxruntime not installed, skipping ONNX export")
+        _remove_export(path)
+        return False
+
+    vectorizer = pipeline.steps[0][1]
+    estimator = pipeline.steps[-1][1]
+    onx = to_onnx(
+        pipeline,
+        initial_types=[("text", StringTensorType([None, 1]))],
+        options={
+            # Plain probability tensor instead of a list of per-row dicts
+            id(estimator): {"zipmap": False},
+            # The StringNormalizer otherwise needs the en_US.UTF-8 locale,
+            # which slim containers lack (the session then fails to load)
+            id(vectorizer): {"locale": "C"},
+        },
+    )
+    meta = onx.metadata_props.add()
+    meta.key = CLASSES_METADATA_KEY
+    meta.value = json.dumps(estimator.classes_.tolist())
+    model = onx.SerializeToString()
+
+    session = onnxruntime.InferenceSession(model, providers=["CPUExecutionProvider"])
+    exported = OnnxPipeline(session, estimator.classes_).predict_proba(texts)
+    expected = pipeline.predict_proba(texts)
+    if exported.shape != expected.shape or not np.allclose(exported, expected, atol=EXPORT_TOLERANCE):
+        logger.warning("ONNX export of %s disagrees with the sklearn pipeline, not written", path)
+        _remove_export(path)
+        return False
+
+    with open(path, "wb") as f:
+        f.write(model)
+    return True
+
+
+def _remove_export(path: str):
+    """Delete an earlier export so it can't be loaded with newer models"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,156 @@
+"""
+LIFELINE AI - OpenAI Client
+Process-wide AsyncOpenAI client shared by the AI services
+"""
+
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional, TYPE_CHECKING
+import orjson
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> Optional["AsyncOpenAI"]:
+    """Shared AsyncOpenAI client, or None when AI is disabled or no key is set"""
+    if not (settings.AI_ENABLED and settings.OPENAI_API_KEY):
+        return None
+
+    import httpx
+    from openai import AsyncOpenAI
+
+    # One client keeps its HTTP connection pool alive across calls. Tight
+    # timeouts bound the tail: a stalled call fails fast and the services
+    # fall back to their rules/templates instead of hanging the request
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=httpx.Timeout(
+            settings.OPENAI_TIMEOUT_SECONDS,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+        ),
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+
+
+async def close_openai_client():
+    """Close the shared client if one was created"""
+    if get_openai_client.cache_info().currsize:
+        client = get_openai_client()
+        if client is not None:
+            await client.close()
+        get_openai_client.cache_clear()
+
+
+def _json_object_end(text: str, start: int) -> int:
+    """Index just past the JSON object opening at start, or -1 if it isn't closed yet"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return -1
+
+
+def _delta_text(chunk: Any) -> Optional[str]:
+    """Text carried by one streamed chunk, from content or tool-call arguments"""
+    if not chunk.choices:
+        return None
+    delta = chunk.choices[0].delta
+    text = delta.content
+    if not text and delta.tool_calls:
+        # Forced tool calls stream their JSON arguments instead of content
+        function = delta.tool_calls[0].function
+        text = function.arguments if function else None
+    return text
+
+
+async def stream_json_completion(client: "AsyncOpenAI", **kwargs) -> Dict[str, Any]:
+    """
+    Stream a chat completion that answers with a JSON object (JSON mode or
+    a forced tool call) and stop reading as soon as the top-level object
+    closes, instead of waiting for the trailing tokens
+    """
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    buffer = ""
+    start = -1
+    try:
+        async for chunk in stream:
+            text = _delta_text(chunk)
+            if not text:
+                continue
+            buffer += text
+
+            if start < 0:
+                start = buffer.find("{")
+                if start < 0:
+                    continue
+
+            # Rescan from the object start; responses are only a few hundred characters
+            end = _json_object_end(buffer, start)
+            if end > 0:
+                try:
+                    return orjson.loads(buffer[start:end])
+                except orjson.JSONDecodeError:
+                    # Not valid JSON after all; read the rest and parse it whole
+                    pass
+    finally:
+        await stream.close()
+
+    return orjson.loads(buffer)
+
+
+async def stream_json_array_items(client: "AsyncOpenAI", **kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a chat completion whose JSON answer wraps a single array of
+    objects (e.g. {"instructions": [...]}) and yield each array item as
+    soon as its closing brace arrives
+    """
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    buffer = ""
+    cursor = -1
+    try:
+        async for chunk in stream:
+            text = _delta_text(chunk)
+            if not text:
+                continue
+            buffer += text
+
+            if cursor < 0:
+                cursor = buffer.find("[")
+                if cursor < 0:
+                    continue
+                cursor += 1
+
+            # Emit every item completed so far; only the open one is rescanned
+            while True:
+                start = buffer.find("{", cursor)
+                close = buffer.find("]", cursor)
+                if close >= 0 and (start < 0 or close < start):
+                    return
+                if start < 0:
+                    break
+                end = _json_object_end(buffer, start)
+                if end < 0:
+                    break
+                yield orjson.loads(buffer[start:end])
+                cursor = end
+    finally:
+        await stream.close()
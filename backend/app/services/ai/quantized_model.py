@@ -0,0 +1,80 @@
+"""
+LIFELINE AI - Quantized Model
+int8 replacement for the naive Bayes step of the trained pipelines
+"""
+
+from typing import Any, List
+import logging
+import numpy as np
+
+from app.services.ai.tfidf import TfidfFeatures
+
+logger = logging.getLogger(__name__)
+
+
+class QuantizedNBPipeline:
+    """
+    TF-IDF + MultinomialNB pipeline whose per-class feature log
+    probabilities are stored as int8 with a per-class affine scale.
+
+    Each row w of feature_log_prob_ is approximated by q * scale + offset,
+    so X @ w.T becomes (X @ q.T) * scale + sum(X) * offset.
+
+    SciPy has no sparse x int8 product (it would upcast q to float64 on
+    every call), so q is multiplied as a float32 copy made once here; its
+    integer values are exact in float32.
+    """
+
+    def __init__(self, vectorizer: Any, feature_log_prob: np.ndarray, class_log_prior: np.ndarray, classes: np.ndarray):
+        self.vectorizer = vectorizer
+        self.features = TfidfFeatures(vectorizer)
+        self.classes_ = classes
+        self.class_log_prior = class_log_prior.astype(np.float64)
+
+        low = feature_log_prob.min(axis=1)
+        high = feature_log_prob.max(axis=1)
+        self.offset = (high + low) / 2
+        self.scale = np.maximum((high - low) / 254, np.finfo(np.float64).tiny)
+
+        # Features x classes, so the sparse product needs no transpose
+        quantized = np.round((feature_log_prob - self.offset[:, None]) / self.scale[:, None])
+        self.weights = np.ascontiguousarray(quantized.T, dtype=np.int8)
+        self._product_weights = self.weights.astype(np.float32)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Class probabilities, as MultinomialNB.predict_proba computes them"""
+        return self.predict_proba_features(self.features.transform(texts))
+
+    def predict_proba_features(self, X: Any) -> np.ndarray:
+        """Class probabilities for an already vectorized TF-IDF matrix"""
+        row_sums = np.asarray(X.sum(axis=1))
+        # Matching dtypes keep SciPy from converting the weights per call
+        # (only the few nonzeros of X are cast)
+        products = X.astype(np.float32, copy=False) @ self._product_weights
+        jll = np.asarray(products, dtype=np.float64) * self.scale + row_sums * self.offset + self.class_log_prior
+
+        # Normalize in log space (softmax)
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+
+def quantize_pipeline(pipeline: Any) -> Any:
+    """Quantize a fitted TF-IDF + MultinomialNB pipeline; other models are returned unchanged"""
+    try:
+        steps = pipeline.steps
+        vectorizer = steps[0][1]
+        estimator = steps[-1][1]
+        if len(steps) != 2 or not hasattr(estimator, "feature_log_prob_"):
+            return pipeline
+
+        return QuantizedNBPipeline(
+            vectorizer=vectorizer,
+            feature_log_prob=estimator.feature_log_prob_,
+            class_log_prior=estimator.class_log_prior_,
+            classes=estimator.classes_,
+        )
+    except Exception as e:
+        logger.warning("Model quantization skipped: %s", e)
+        return pipeline
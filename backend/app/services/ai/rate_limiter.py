@@ -0,0 +1,130 @@
+"""
+LIFELINE AI - OpenAI Rate Limiter
+Bounded concurrency plus request/token budgets for OpenAI calls
+"""
+
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional, TypeVar
+import asyncio
+import logging
+import math
+import random
+import time
+
+from openai import RateLimitError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rough characters-per-token ratio for English prompts
+CHARS_PER_TOKEN = 4
+
+# Attempts per call when OpenAI answers 429
+MAX_RATE_LIMIT_ATTEMPTS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting (no tokenizer needed)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter on requests and tokens per minute, refilled
+    continuously, with a cap on in-flight calls
+    """
+
+    def __init__(
+        self,
+        max_requests_per_minute: int,
+        max_tokens_per_minute: int,
+        max_concurrency: int
+    ):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.available_request_capacity = float(max_requests_per_minute)
+        self.available_token_capacity = float(max_tokens_per_minute)
+        self._last_update = time.monotonic()
+        # Created on first use so they bind to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_request_capacity = min(
+            self.max_requests_per_minute,
+            self.available_request_capacity + elapsed * self.max_requests_per_minute / 60.0,
+        )
+        self.available_token_capacity = min(
+            self.max_tokens_per_minute,
+            self.available_token_capacity + elapsed * self.max_tokens_per_minute / 60.0,
+        )
+
+    async def acquire(self, tokens: int):
+        """Wait for a concurrency slot and enough request/token capacity"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._lock = asyncio.Lock()
+
+        # A single call can never need more than the whole per-minute budget
+        tokens = min(tokens, self.max_tokens_per_minute)
+
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                        self.available_request_capacity -= 1
+                        self.available_token_capacity -= tokens
+                        return
+
+                    wait = max(
+                        (1 - self.available_request_capacity) * 60.0 / self.max_requests_per_minute,
+                        (tokens - self.available_token_capacity) * 60.0 / self.max_tokens_per_minute,
+                    )
+                    await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        """Free the concurrency slot taken by acquire()"""
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def limit(self, tokens: int):
+        """Hold a slot and budget for the duration of one call"""
+        await self.acquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def call(self, tokens: int, make_call: Callable[[], Awaitable[T]]) -> T:
+        """Run an OpenAI call under the limiter, backing off on 429 responses"""
+        for attempt in range(MAX_RATE_LIMIT_ATTEMPTS):
+            try:
+                async with self.limit(tokens):
+                    return await make_call()
+            except RateLimitError:
+                if attempt == MAX_RATE_LIMIT_ATTEMPTS - 1:
+                    raise
+                delay = 2 ** attempt + random.random()
+                logger.warning("OpenAI rate limited, retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+
+
+# Shared by every service that talks to OpenAI. The configured budgets
+# are account-wide, so each worker process gets an equal share
+openai_limiter = RateLimiter(
+    max_requests_per_minute=max(1, settings.OPENAI_MAX_REQUESTS_PER_MINUTE // settings.SERVER_PROCESSES),
+    max_tokens_per_minute=max(1, settings.OPENAI_MAX_TOKENS_PER_MINUTE // settings.SERVER_PROCESSES),
+    max_concurrency=max(1, math.ceil(settings.OPENAI_MAX_CONCURRENCY / settings.SERVER_PROCESSES)),
+)
@@ -0,0 +1,211 @@
+"""
+LIFELINE AI - Semantic Cache
+Reuse AI results for inputs whose embeddings are nearly identical
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+import os
+import numpy as np
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; saves are then not serialized
+    fcntl = None
+
+from app.core.config import settings
+from app.services.ai.rate_limiter import estimate_tokens, openai_limiter
+
+logger = logging.getLogger(__name__)
+
+
+async def embed_texts(client, texts: List[str]) -> np.ndarray:
+    """Embed texts with one API call; rows are L2-normalized float32 vectors"""
+    response = await openai_limiter.call(
+        sum(estimate_tokens(text) for text in texts),
+        lambda: client.embeddings.create(
+            model=settings.OPENAI_EMBEDDING_MODEL,
+            input=texts,
+        ),
+    )
+    vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SemanticCache:
+    """
+    Fixed-size, in-process inner-product index over normalized embeddings
+    (cosine similarity), with the oldest entries overwritten when full
+
+    Every worker process shares one file: each loads it at startup, and
+    at shutdown merges its entries into whatever the file holds by then
+    (see save).
+    """
+
+    def __init__(self, max_entries: int, threshold: float, path: str = ""):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.path = path
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self._next = 0
+        self._count = 0
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def lookup(self, vectors: np.ndarray) -> List[Optional[Any]]:
+        """Best cached value per query vector, or None below the similarity threshold"""
+        if self._count == 0:
+            return [None] * len(vectors)
+
+        scores = vectors @ self._vectors[:self._count].T
+        best = scores.argmax(axis=1)
+        return [
+            self._values[index] if scores[row, index] >= self.threshold else None
+            for row, index in enumerate(best)
+        ]
+
+    async def resolve(
+        self,
+        client,
+        keys: List[str],
+        compute: Callable[[List[int]], Awaitable[List[Dict[str, Any]]]],
+        hit_source: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        One result per key: cached for near-duplicates of earlier keys,
+        otherwise from compute(indices of the missing keys)
+
+        Fresh AI results are added to the cache; if embedding fails every
+        key is computed. hit_source, when set, replaces the source of
+        cached results.
+        """
+        try:
+            vectors = await embed_texts(client, keys)
+        except Exception as e:
+            logger.warning("Embedding failed: %s, skipping semantic cache", e)
+            return await compute(list(range(len(keys))))
+
+        results: List[Optional[Dict[str, Any]]] = []
+        misses = []
+        for index, cached in enumerate(self.lookup(vectors)):
+            if cached is None:
+                misses.append(index)
+                results.append(None)
+            elif hit_source is None:
+                results.append(cached)
+            else:
+                results.append({**cached, "source": hit_source})
+
+        if misses:
+            for index, result in zip(misses, await compute(misses)):
+                results[index] = result
+                # Only real AI answers are worth reusing
+                if result["source"] == "ai":
+                    self.add(vectors[index], result)
+
+        return results
+
+    def add(self, vector: np.ndarray, value: Any):
+        """Store a value under its embedding"""
+        if self._vectors is None:
+            self._vectors = np.empty((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        self._vectors[self._next] = vector
+        if self._next < len(self._values):
+            self._values[self._next] = value
+        else:
+            self._values.append(value)
+
+        self._next = (self._next + 1) % self.max_entries
+        self._count = min(self._count + 1, self.max_entries)
+
+    def _entries(self) -> Tuple[np.ndarray, List[Any]]:
+        """Cached vectors and values, oldest first"""
+        if self._count < self.max_entries:
+            return self._vectors[:self._count], self._values[:self._count]
+        order = np.roll(np.arange(self.max_entries), -self._next)
+        return self._vectors[order], [self._values[index] for index in order.tolist()]
+
+    def _read(self) -> Tuple[np.ndarray, List[Any]]:
+        """Vectors and values in the file, oldest first"""
+        with np.load(self.path) as data:
+            vectors = data["vectors"]
+            values = orjson.loads(data["values"].item())
+            next_index = int(data["next"]) % len(vectors) if len(vectors) else 0
+        order = np.roll(np.arange(len(vectors)), -next_index)
+        return vectors[order], [values[index] for index in order.tolist()]
+
+    def save(self):
+        """
+        Merge the index into the file on disk (no-op without a path or entries)
+
+        Entries already in the file are kept ahead of this process's, so
+        workers saving one after another all contribute; duplicates (the
+        entries every worker loaded at startup) are stored once. Where
+        fcntl is available the merge holds an exclusive lock on a
+        .lock file next to the cache, and the new file always replaces
+        the old one atomically, so a reader never sees a partial write.
+        """
+        if not self.path or self._count == 0:
+            return
+
+        try:
+            with open(self.path + ".lock", "wb") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+
+                vectors, values = self._entries()
+                if os.path.exists(self.path):
+                    try:
+                        saved_vectors, saved_values = self._read()
+                    except Exception as e:
+                        logger.warning("Ignoring unreadable semantic cache file: %s", e)
+                    else:
+                        vectors = np.concatenate((saved_vectors, vectors))
+                        values = saved_values + values
+
+                # Keep the newest copy of each embedding, then the newest entries
+                seen = set()
+                keep = []
+                for index in range(len(vectors) - 1, -1, -1):
+                    key = vectors[index].tobytes()
+                    if key not in seen:
+                        seen.add(key)
+                        keep.append(index)
+                keep = keep[:self.max_entries][::-1]
+
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as f:
+                    np.savez(
+                        f,
+                        vectors=vectors[keep],
+                        values=np.array(orjson.dumps([values[index] for index in keep])),
+                        # Stored oldest first
+                        next=np.array(0),
+                    )
+                os.replace(temp_path, self.path)
+            logger.info("Saved %d semantic cache entries to %s", len(keep), self.path)
+        except Exception as e:
+            logger.error("Error saving semantic cache: %s", e)
+
+    def load(self):
+        """Restore an index written by save()"""
+        try:
+            vectors, values = self._read()
+            vectors = vectors[-self.max_entries:]
+            values = values[-self.max_entries:]
+
+            self._vectors = np.empty((self.max_entries, vectors.shape[1]), dtype=np.float32)
+            self._count = len(vectors)
+            self._vectors[:self._count] = vectors
+            self._values = values
+            # Entries are oldest first, so the next write goes after them
+            self._next = self._count % self.max_entries
+            logger.info("Loaded %d semantic cache entries from %s", self._count, self.path)
+        except Exception as e:
+            logger.error("Error loading semantic cache: %s", e)
+            self._vectors, self._values, self._next, self._count = None, [], 0, 0
@@ -3,14 +3,86 @@ LIFELINE AI - Severity Scorer Service
 AI-powered severity assessment
 """
 
-from typing import Dict, Any
+from bisect import bisect_right
+from collections import Counter
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
+import asyncio
 import logging
+import orjson
 
 from app.core.config import settings
 from app.models.schemas import SeverityLevel
+from app.services.ai.keyword_matcher import KeywordMatcher
+from app.services.ai.openai_client import get_openai_client
+from app.services.ai.rate_limiter import estimate_tokens, openai_limiter
+from app.services.ai.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Values accepted from the AI scorer
+_SEVERITY_VALUES = frozenset(level.value for level in SeverityLevel)
+
+# Lower score bound of each severity band above "low", per the rubric below
+_SEVERITY_THRESHOLDS = (0.4, 0.6, 0.8)
+_SEVERITY_BANDS = ("low", "moderate", "high", "critical")
+
+# Emergency types the rules always rate critical, whatever the description
+_ALWAYS_CRITICAL_TYPES = frozenset({"cardiac", "respiratory"})
+# Emergency types the rules rate at least high
+_AT_LEAST_HIGH_TYPES = frozenset({"bleeding", "fracture", "burn"})
+
+# Descriptions shorter than this carry too little for the AI to improve on the rules
+MIN_AI_CONTENT_CHARS = 10
+
+# Token allowance reserved for each severity response
+SEVERITY_RESPONSE_TOKENS = 100
+
+# Rubric and answer format as a fixed system prefix (eligible for OpenAI's
+# automatic prompt caching); the user turn only carries the emergency
+_SEVERITY_SYSTEM_PROMPT = """You are an emergency medical severity assessment AI. Assess emergency severity accurately.
+
+Assess the severity of the emergency situation described by the user.
+
+Rate the severity on a scale of 0.0 to 1.0:
+- 0.8-1.0: CRITICAL - Life-threatening, immediate danger
+- 0.6-0.79: HIGH - Serious, needs urgent attention
+- 0.4-0.59: MODERATE - Needs medical attention but not immediately life-threatening
+- 0.0-0.39: LOW - Minor issue, can wait or self-treat
+
+Respond in JSON format:
+{
+    "severity": "critical|high|moderate|low",
+    "score": 0.0-1.0,
+    "reasoning": "brief explanation"
+}"""
+
+_SEVERITY_SYSTEM_TOKENS = estimate_tokens(_SEVERITY_SYSTEM_PROMPT)
+
+# Indicator keywords for the rule-based fallback, per severity level
+RULE_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "critical": (
+        "unconscious", "not breathing", "cardiac arrest", "severe bleeding",
+        "can't breathe", "choking", "severe pain", "chest pain", "heart attack"
+    ),
+    "high": (
+        "broken", "fracture", "burn", "poison", "severe", "urgent", "emergency"
+    ),
+    "moderate": (
+        "pain", "hurt", "injury", "bleeding", "cut", "wound"
+    ),
+})
+
+_KEYWORD_SEVERITY: Dict[str, str] = {
+    keyword: severity for severity, keywords in RULE_KEYWORDS.items() for keyword in keywords
+}
+_SEVERITY_MATCHER = KeywordMatcher(_KEYWORD_SEVERITY)
+
+
+def severity_for_score(score: float) -> str:
+    """Severity band for a 0.0-1.0 score"""
+    return _SEVERITY_BANDS[bisect_right(_SEVERITY_THRESHOLDS, score)]
+
 
 class SeverityScorer:
     """Score emergency severity level"""
@@ -18,6 +90,13 @@ class SeverityScorer:
     def __init__(self):
         self.ai_enabled = settings.AI_ENABLED
         self.openai_key = settings.OPENAI_API_KEY
+        self._aclient = get_openai_client()
+        self._semantic_cache = None
+        if self._aclient is not None and settings.SEMANTIC_CACHE_ENABLED:
+            self._semantic_cache = SemanticCache(
+                max_entries=settings.SEMANTIC_CACHE_SIZE,
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            )
         
     async def score(
         self,
@@ -36,76 +115,108 @@ class SeverityScorer:
         Returns:
             Dictionary with 'severity' and 'score' keys
         """
+        results = await self.score_batch(
+            [emergency_type], [content], [classification_confidence]
+        )
+        return results[0]
+    
+    async def score_batch(
+        self,
+        emergency_types: List[str],
+        contents: List[str],
+        classification_confidences: List[float]
+    ) -> List[Dict[str, Any]]:
+        """
+        Score severity for several emergencies, preserving input order
+        """
+        items = list(zip(emergency_types, contents, classification_confidences))
         try:
-            if self.ai_enabled and self.openai_key:
-                return await self._score_with_ai(emergency_type, content)
+            if self._aclient is not None:
+                # Inputs the rules settle on their own skip the AI round-trip
+                results: List[Dict[str, Any]] = [None] * len(items)
+                ai_indices = []
+                for index, (emergency_type, content, confidence) in enumerate(items):
+                    if emergency_type in _ALWAYS_CRITICAL_TYPES or len(content.strip()) < MIN_AI_CONTENT_CHARS:
+                        results[index] = await self._score_with_rules(emergency_type, content, confidence)
+                    else:
+                        ai_indices.append(index)
+                
+                if ai_indices:
+                    ai_results = await self._score_many_with_ai(
+                        [emergency_types[index] for index in ai_indices],
+                        [contents[index] for index in ai_indices]
+                    )
+                    for index, result in zip(ai_indices, ai_results):
+                        results[index] = result
+                return results
             else:
-                return await self._score_with_rules(emergency_type, content, classification_confidence)
+                return [
+                    await self._score_with_rules(emergency_type, content, confidence)
+                    for emergency_type, content, confidence in items
+                ]
                 
         except Exception as e:
-            logger.error(f"Severity scoring error: {str(e)}")
-            return await self._score_with_rules(emergency_type, content, classification_confidence)
+            logger.error("Severity scoring error: %s", e)
+            return [
+                await self._score_with_rules(emergency_type, content, confidence)
+                for emergency_type, content, confidence in items
+            ]
+    
+    async def _score_many_with_ai(
+        self,
+        emergency_types: List[str],
+        contents: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Score with AI, reusing scores of paraphrased earlier descriptions"""
+        async def score(indices: List[int]) -> List[Dict[str, Any]]:
+            return list(await asyncio.gather(
+                *(self._score_with_ai(emergency_types[index], contents[index]) for index in indices)
+            ))
+        
+        if self._semantic_cache is None:
+            return await score(list(range(len(contents))))
+        
+        # The type is part of the embedded text, so only same-type inputs match
+        keys = [f"{emergency_type}: {content}" for emergency_type, content in zip(emergency_types, contents)]
+        return await self._semantic_cache.resolve(self._aclient, keys, score)
     
     async def _score_with_ai(self, emergency_type: str, content: str) -> Dict[str, Any]:
         """Score severity using AI/LLM"""
         try:
-            from openai import OpenAI
+            prompt = f"""Emergency Type: {emergency_type}
+Description: {content}"""
             
-            client = OpenAI(api_key=self.openai_key)
-            
-            prompt = f"""Assess the severity of this emergency situation:
-
-Emergency Type: {emergency_type}
-Description: {content}
-
-Rate the severity on a scale of 0.0 to 1.0:
-- 0.8-1.0: CRITICAL - Life-threatening, immediate danger
-- 0.6-0.79: HIGH - Serious, needs urgent attention
-- 0.4-0.59: MODERATE - Needs medical attention but not immediately life-threatening
-- 0.0-0.39: LOW - Minor issue, can wait or self-treat
-
-Respond in JSON format:
-{{
-    "severity": "critical|high|moderate|low",
-    "score": 0.0-1.0,
-    "reasoning": "brief explanation"
-}}"""
-            
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are an emergency medical severity assessment AI. Assess emergency severity accurately."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.2,
+            response = await openai_limiter.call(
+                _SEVERITY_SYSTEM_TOKENS + estimate_tokens(prompt) + SEVERITY_RESPONSE_TOKENS,
+                lambda: self._aclient.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": _SEVERITY_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.2,
+                ),
             )
             
-            import json
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
             
             # Validate severity level
             severity = result.get("severity", "moderate").lower()
-            if severity not in [s.value for s in SeverityLevel]:
+            score = float(result.get("score", 0.5))
+            if severity not in _SEVERITY_VALUES:
                 # Map score to severity if invalid
-                score = float(result.get("score", 0.5))
-                if score >= 0.8:
-                    severity = "critical"
-                elif score >= 0.6:
-                    severity = "high"
-                elif score >= 0.4:
-                    severity = "moderate"
-                else:
-                    severity = "low"
+                severity = severity_for_score(score)
             
             return {
                 "severity": severity,
-                "score": float(result.get("score", 0.5)),
+                "score": score,
                 "reasoning": result.get("reasoning", ""),
+                "source": "ai",
             }
             
         except Exception as e:
-            logger.warning(f"AI severity scoring failed: {str(e)}, falling back to rules")
+            logger.warning("AI severity scoring failed: %s, falling back to rules", e)
             return await self._score_with_rules(emergency_type, content, 0.7)
     
     async def _score_with_rules(
@@ -115,33 +226,17 @@ Respond in JSON format:
         confidence: float
     ) -> Dict[str, Any]:
         """Rule-based severity scoring"""
-        content_lower = content.lower()
-        
-        # Critical indicators
-        critical_keywords = [
-            "unconscious", "not breathing", "cardiac arrest", "severe bleeding",
-            "can't breathe", "choking", "severe pain", "chest pain", "heart attack"
-        ]
-        
-        # High severity indicators
-        high_keywords = [
-            "broken", "fracture", "burn", "poison", "severe", "urgent", "emergency"
-        ]
-        
-        # Moderate indicators
-        moderate_keywords = [
-            "pain", "hurt", "injury", "bleeding", "cut", "wound"
-        ]
-        
-        critical_count = sum(1 for keyword in critical_keywords if keyword in content_lower)
-        high_count = sum(1 for keyword in high_keywords if keyword in content_lower)
-        moderate_count = sum(1 for keyword in moderate_keywords if keyword in content_lower)
+        # Distinct keywords per severity level, found in a single regex scan
+        counts = Counter(_KEYWORD_SEVERITY[keyword] for keyword in _SEVERITY_MATCHER.find(content))
+        critical_count = counts["critical"]
+        high_count = counts["high"]
+        moderate_count = counts["moderate"]
         
         # Determine severity based on keywords and emergency type
-        if critical_count > 0 or emergency_type in ["cardiac", "respiratory"]:
+        if critical_count > 0 or emergency_type in _ALWAYS_CRITICAL_TYPES:
             severity = "critical"
             score = min(1.0, 0.8 + (critical_count * 0.05))
-        elif high_count > 0 or emergency_type in ["bleeding", "fracture", "burn"]:
+        elif high_count > 0 or emergency_type in _AT_LEAST_HIGH_TYPES:
             severity = "high"
             score = min(0.79, 0.6 + (high_count * 0.05))
         elif moderate_count > 0:
@@ -158,4 +253,5 @@ Respond in JSON format:
             "severity": severity,
             "score": score,
             "reasoning": "Rule-based severity assessment",
+            "source": "rules",
         }
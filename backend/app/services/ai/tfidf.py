@@ -0,0 +1,136 @@
+"""
+LIFELINE AI - TF-IDF Features
+Fitted TfidfVectorizer transform without the intermediate sparse copy
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+import re
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+
+def _build_tokenizer(vectorizer: Any) -> Callable[[str], List[str]]:
+    """
+    Word tokens for vocabulary lookup in one regex pass
+
+    Stop words were removed before a fitted vocabulary was built, so they
+    can never match it; for plain unigram word analyzers the stop word filter
+    is skipped and the vocabulary lookup drops them instead. Any other
+    configuration uses the vectorizer's own analyzer.
+    """
+    plain_words = (
+        vectorizer.analyzer == "word"
+        and tuple(vectorizer.ngram_range) == (1, 1)
+        and vectorizer.tokenizer is None
+        and vectorizer.preprocessor is None
+        and vectorizer.strip_accents is None
+        and vectorizer.token_pattern is not None
+        and vectorizer.vocabulary is None
+    )
+    if not plain_words:
+        return vectorizer.build_analyzer()
+
+    findall = re.compile(vectorizer.token_pattern).findall
+    if vectorizer.lowercase:
+        return lambda text: findall(text.lower())
+    return findall
+
+
+class TfidfFeatures:
+    """
+    Same matrix as a fitted TfidfVectorizer's transform(texts), built from
+    its tokenizer, vocabulary and IDF weights taken out of it once
+
+    CountVectorizer.transform rebuilds the analyzer and revalidates the
+    vocabulary on every call, then TfidfTransformer multiplies the counts
+    by a diagonal IDF matrix, allocating a second CSR matrix; for short
+    queries that setup is most of the transform cost.
+    """
+
+    def __init__(self, vectorizer: Any):
+        self.params = vectorizer.get_params()
+        self.tokenize = _build_tokenizer(vectorizer)
+        self.vocabulary = vectorizer.vocabulary_
+        self.n_features = len(self.vocabulary)
+        self.sublinear_tf = vectorizer.sublinear_tf
+        # copy=False keeps a memory-mapped idf_ shared when its dtype already matches
+        self.idf = vectorizer.idf_.astype(vectorizer.dtype, copy=False) if vectorizer.use_idf else None
+        self.norm = vectorizer.norm
+        self.dtype = vectorizer.dtype
+
+    def matches(self, other: "TfidfFeatures") -> bool:
+        """Whether both produce the same matrix (same settings, vocabulary and IDF)"""
+        if self.params != other.params or self.vocabulary != other.vocabulary:
+            return False
+        if self.idf is None or other.idf is None:
+            return self.idf is other.idf
+        return np.array_equal(self.idf, other.idf)
+
+    def _row_counts(self, text: str) -> Dict[int, int]:
+        """Term counts of one text by vocabulary column"""
+        row = {}
+        for token in self.tokenize(text):
+            index = self.vocabulary.get(token)
+            if index is not None:
+                row[index] = row.get(index, 0) + 1
+        return row
+
+    def _weight(self, indices: np.ndarray, counts: Any) -> np.ndarray:
+        """TF-IDF values for term counts at the given columns (not normalized)"""
+        data = np.asarray(counts, dtype=self.dtype)
+        if self.sublinear_tf:
+            np.log(data, out=data)
+            data += 1
+        if self.idf is not None:
+            data *= self.idf.take(indices)
+        return data
+
+    def transform_one(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nonzero columns and values of one text's TF-IDF row, without
+        building a sparse matrix (the row is sparse: a handful of terms)
+        """
+        row = self._row_counts(text)
+        indices = np.fromiter(row.keys(), dtype=np.int32, count=len(row))
+        data = self._weight(indices, list(row.values()))
+        if self.norm == "l2":
+            norm = np.sqrt(np.dot(data, data))
+        elif self.norm == "l1":
+            norm = np.abs(data).sum()
+        else:
+            norm = 0
+        if norm > 0:
+            data /= norm
+        return indices, data
+
+    def transform(self, texts: List[str]):
+        """TF-IDF weighted CSR matrix, one row per text"""
+        # Vocabulary columns of every token of every text, in one flat array;
+        # counting and sorting them per row is then one np.unique call
+        columns = []
+        lengths = []
+        lookup = self.vocabulary.get
+        for text in texts:
+            row = [index for index in map(lookup, self.tokenize(text)) if index is not None]
+            columns.extend(row)
+            lengths.append(len(row))
+
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        keys, counts = np.unique(
+            rows * self.n_features + np.asarray(columns, dtype=np.int64),
+            return_counts=True,
+        )
+        indices = (keys % self.n_features).astype(np.int32)
+        indptr = np.zeros(len(texts) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(keys // self.n_features, minlength=len(texts)), out=indptr[1:])
+        data = self._weight(indices, counts)
+
+        X = sp.csr_matrix(
+            (data, indices, indptr),
+            shape=(len(texts), self.n_features),
+        )
+        if self.norm is not None:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
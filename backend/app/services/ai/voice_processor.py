@@ -3,14 +3,22 @@ LIFELINE AI - Voice Processing Service
 Speech-to-text conversion for voice inputs
 """
 
+import asyncio
 import base64
-import io
 import logging
 
 from app.core.config import settings
+from app.services.ai.openai_client import get_openai_client
+from app.services.ai.rate_limiter import openai_limiter
 
 logger = logging.getLogger(__name__)
 
+# Base64 payloads longer than this (~256KB of audio) are decoded in a thread
+INLINE_DECODE_MAX_CHARS = 350_000
+
+# MIME types of the upload formats whose type is not "audio/<format>"
+_AUDIO_CONTENT_TYPES = {"m4a": "audio/mp4", "mp3": "audio/mpeg"}
+
 
 class VoiceProcessor:
     """Process voice/audio input to text"""
@@ -18,6 +26,7 @@ class VoiceProcessor:
     def __init__(self):
         self.ai_enabled = settings.AI_ENABLED
         self.openai_key = settings.OPENAI_API_KEY
+        self._aclient = get_openai_client()
         
     async def transcribe(
         self,
@@ -35,7 +44,7 @@ class VoiceProcessor:
             Transcribed text
         """
         try:
-            if self.ai_enabled and self.openai_key:
+            if self._aclient is not None:
                 return await self._transcribe_with_ai(audio_data, format)
             else:
                 # Fallback: return placeholder
@@ -43,7 +52,7 @@ class VoiceProcessor:
                 return "Voice input received. Please provide text description of the emergency."
                 
         except Exception as e:
-            logger.error(f"Voice transcription error: {str(e)}")
+            logger.error("Voice transcription error: %s", e)
             return "Unable to process voice input. Please try text input instead."
     
     async def _transcribe_with_ai(
@@ -53,24 +62,29 @@ class VoiceProcessor:
     ) -> str:
         """Transcribe using OpenAI Whisper API"""
         try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=self.openai_key)
-            
-            # Decode base64 audio
-            audio_bytes = base64.b64decode(audio_data)
-            audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = f"audio.{format}"
+            # Decode base64 audio; large clips are decoded off the event loop
+            if len(audio_data) > INLINE_DECODE_MAX_CHARS:
+                audio_bytes = await asyncio.to_thread(base64.b64decode, audio_data)
+            else:
+                audio_bytes = base64.b64decode(audio_data)
+            # (filename, content, content type) tells the API the format
+            content_type = _AUDIO_CONTENT_TYPES.get(format.lower(), f"audio/{format.lower()}")
+            audio_file = (f"audio.{format}", audio_bytes, content_type)
             
-            # Transcribe
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="en"
+            # Transcribe; Whisper is billed per audio minute, so only the
+            # request budget applies
+            transcript = await openai_limiter.call(
+                0,
+                lambda: self._aclient.audio.transcriptions.create(
+                    model=settings.OPENAI_TRANSCRIPTION_MODEL,
+                    file=audio_file,
+                    language="en",
+                    timeout=settings.OPENAI_MEDIA_TIMEOUT_SECONDS,
+                ),
             )
             
             return transcript.text
             
         except Exception as e:
-            logger.error(f"OpenAI transcription error: {str(e)}")
+            logger.error("OpenAI transcription error: %s", e)
             raise Exception(f"Voice transcription failed: {str(e)}")
@@ -0,0 +1,348 @@
+"""
+LIFELINE AI - Hospital Finder Base
+Caching, ranking and fallback shared by the provider-backed hospital finders
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import logging
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from app.models.schemas import LocationData, Hospital
+from app.core.config import settings
+from app.services.location.cache import SearchRegionIndex, TTLCache, response_cache_area, search_cache_key
+from app.services.location.geo import EARTH_RADIUS_KM, haversine_km, nearest_within
+
+logger = logging.getLogger(__name__)
+
+# Cells with at least this many results get a BallTree (haversine metric)
+# that is cached with them; smaller cells rank faster in one vectorized pass
+BALLTREE_MIN_POINTS = 256
+
+# Stored in place of a shared cell response the provider truncated, so
+# later searches in that cell go straight to per-user queries
+_TRUNCATED_CELL = object()
+
+# Name stems for generated fallback hospitals
+_FALLBACK_HOSPITAL_NAMES = (
+    "General Hospital", "Medical Center", "Community Hospital",
+    "Regional Medical Center", "Emergency Hospital", "City Hospital",
+)
+
+
+class _IndexedResults(NamedTuple):
+    """Usable raw results of one provider response and their coordinates"""
+    candidates: List[Dict[str, Any]]
+    lats: np.ndarray
+    lons: np.ndarray
+    tree: Optional[BallTree]
+
+
+class _FetchedResults(NamedTuple):
+    """Provider results for one search and how much of it they answer"""
+    results: _IndexedResults
+    # Radius (km) around the user the response covers
+    radius: float
+    # False when the provider capped the response, so it may omit closer results
+    complete: bool
+
+
+class SearchResults(NamedTuple):
+    """Provider hospitals of one search, closest first"""
+    hospitals: List[Hospital]
+    # Radius (km) around the user that was actually searched (a provider
+    # limit can make it smaller than the requested one)
+    radius: float
+    # Whether every provider hospital within radius is in hospitals, up to
+    # the MAX_HOSPITAL_RESULTS closest
+    complete: bool
+
+
+class BaseHospitalFinder:
+    """
+    Hospital finder backed by one provider API
+
+    Subclasses make the provider request (_fetch_raw) and read its results
+    (_coordinates, _to_hospital); caching, distance ranking and the
+    generated fallback are shared.
+    """
+
+    # Provider name used in logs
+    PROVIDER_NAME = "Provider"
+    # Largest radius (km) one provider request accepts, or None for no limit
+    MAX_QUERY_RADIUS_KM: Optional[float] = None
+    # Most results one provider request returns, or None if never truncated
+    MAX_QUERY_RESULTS: Optional[int] = None
+
+    def __init__(self):
+        # Random source for fallback hospitals
+        self._rng = np.random.default_rng()
+        self._cache = TTLCache(
+            maxsize=settings.HOSPITAL_CACHE_SIZE,
+            ttl=settings.HOSPITAL_CACHE_TTL_SECONDS,
+        )
+        # Raw provider results per ~5km cell; distances are recomputed
+        # for each user's exact position
+        self._responses = TTLCache(
+            maxsize=settings.HOSPITAL_CACHE_SIZE,
+            ttl=settings.HOSPITAL_RESPONSE_CACHE_TTL_SECONDS,
+        )
+        self._regions = SearchRegionIndex(
+            maxsize=settings.HOSPITAL_CACHE_SIZE,
+            ttl=settings.HOSPITAL_CACHE_TTL_SECONDS,
+        )
+
+    async def find_nearby(
+        self,
+        location: LocationData,
+        radius: float = 10.0
+    ) -> List[Hospital]:
+        """
+        Find nearby hospitals, using generated ones if the provider fails
+        """
+        key = search_cache_key(location, radius)
+        hospitals = self._cache.get(key)
+        if hospitals is None:
+            try:
+                found = await self._find(location, radius)
+            except Exception as e:
+                logger.error("%s hospital search error: %s", self.PROVIDER_NAME, e)
+                found = SearchResults([], radius, False)
+
+            # Generated hospitals are never cached or region-indexed, so the
+            # next search (or nearest lookup) asks the provider again
+            # instead of serving them
+            hospitals = found.hospitals
+            if not hospitals:
+                logger.warning("No hospitals found via %s, using fallback", self.PROVIDER_NAME)
+                return await self._find_with_fallback(location, radius)
+            self._cache.set(key, hospitals)
+            # Only a complete search proves which hospital is the nearest
+            if found.complete:
+                self._regions.add(location, found.radius, hospitals, settings.MAX_HOSPITAL_RESULTS)
+
+        # Copies keep callers from modifying cached results
+        return [hospital.model_copy(deep=True) for hospital in hospitals]
+
+    async def find_nearest(
+        self,
+        location: LocationData,
+        radius: float = 10.0
+    ) -> Optional[Hospital]:
+        """
+        Find the single nearest hospital, reusing earlier searches nearby when possible
+        """
+        hospital = self._regions.nearest(location, radius)
+        if hospital is not None:
+            return hospital
+
+        hospitals = await self.find_nearby(location, radius)
+        return hospitals[0] if hospitals else None
+
+    async def _find(
+        self,
+        location: LocationData,
+        radius: float
+    ) -> SearchResults:
+        """Provider hospitals, with no hospitals if it failed or found none (never generated ones)"""
+        return await self.search(location, radius)
+
+    async def search(
+        self,
+        location: LocationData,
+        radius: float
+    ) -> SearchResults:
+        """Hospitals from the provider only, with no hospitals if it failed or found none"""
+        try:
+            fetched = await self._fetch_cached(location, radius)
+            if fetched is None:
+                return SearchResults([], radius, False)
+
+            results = fetched.results
+            complete = fetched.complete
+            indices, distances = self._rank(results, location, fetched.radius)
+
+            # Build hospitals closest first; only the top results are built
+            hospitals = []
+            for index, distance in zip(indices.tolist(), distances.tolist()):
+                try:
+                    hospital = self._to_hospital(
+                        results.candidates[index],
+                        float(results.lats[index]),
+                        float(results.lons[index]),
+                        distance,
+                    )
+                except Exception as e:
+                    logger.warning("Error processing %s result: %s", self.PROVIDER_NAME, e)
+                    # A skipped result may have been the nearest one
+                    complete = False
+                    continue
+                hospitals.append(hospital)
+
+            logger.info("Found %d hospitals via %s", len(hospitals), self.PROVIDER_NAME)
+            return SearchResults(hospitals, fetched.radius, complete)
+
+        except Exception as e:
+            logger.error("%s API error: %s", self.PROVIDER_NAME, e)
+            return SearchResults([], radius, False)
+
+    async def _fetch_cached(
+        self,
+        location: LocationData,
+        radius: float
+    ) -> Optional[_FetchedResults]:
+        """Indexed provider results around the location's cell, or None if the request failed"""
+        key, center_lat, center_lon, query_radius = response_cache_area(location, radius)
+        if self.MAX_QUERY_RADIUS_KM is not None and query_radius > self.MAX_QUERY_RADIUS_KM:
+            # The widened cell query is beyond what the provider accepts
+            return await self._fetch_around_user(location, radius)
+
+        results = self._responses.get(key)
+        if results is _TRUNCATED_CELL:
+            return await self._fetch_around_user(location, radius)
+        if results is None:
+            items = await self._fetch_raw(center_lat, center_lon, query_radius)
+            if items is None:
+                return None
+            if self.MAX_QUERY_RESULTS is not None and len(items) >= self.MAX_QUERY_RESULTS:
+                # A capped response around the cell center can miss this
+                # user's nearest hospitals, so it can't be shared
+                self._responses.set(key, _TRUNCATED_CELL)
+                return await self._fetch_around_user(location, radius)
+            results = self._index(items)
+            self._responses.set(key, results)
+
+        # The cell query reaches radius around every point of the cell
+        return _FetchedResults(results, radius, True)
+
+    async def _fetch_around_user(
+        self,
+        location: LocationData,
+        radius: float
+    ) -> Optional[_FetchedResults]:
+        """Indexed provider results around the user's own position (not cached), or None if the request failed"""
+        if self.MAX_QUERY_RADIUS_KM is not None:
+            radius = min(radius, self.MAX_QUERY_RADIUS_KM)
+        items = await self._fetch_raw(location.latitude, location.longitude, radius)
+        if items is None:
+            return None
+        # A capped response is ranked by the provider, not by distance
+        complete = self.MAX_QUERY_RESULTS is None or len(items) < self.MAX_QUERY_RESULTS
+        return _FetchedResults(self._index(items), radius, complete)
+
+    def _index(self, items: List[Dict[str, Any]]) -> _IndexedResults:
+        """Coordinate arrays for the usable raw results, plus a BallTree for large cells"""
+        candidates = []
+        lats = []
+        lons = []
+        for item in items:
+            coordinates = self._coordinates(item)
+            if coordinates is None:
+                continue
+            candidates.append(item)
+            lats.append(coordinates[0])
+            lons.append(coordinates[1])
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        tree = None
+        if len(candidates) >= BALLTREE_MIN_POINTS:
+            tree = BallTree(np.radians(np.column_stack((lats, lons))), metric="haversine")
+
+        return _IndexedResults(candidates, lats, lons, tree)
+
+    def _rank(
+        self,
+        results: _IndexedResults,
+        location: LocationData,
+        radius: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices of the results within radius, closest first and capped at MAX_HOSPITAL_RESULTS, and their distances"""
+        if results.tree is None:
+            return nearest_within(
+                location.latitude,
+                location.longitude,
+                results.lats,
+                results.lons,
+                radius,
+                settings.MAX_HOSPITAL_RESULTS,
+            )
+
+        indices, distances = results.tree.query_radius(
+            np.radians([[location.latitude, location.longitude]]),
+            r=radius / EARTH_RADIUS_KM,
+            return_distance=True,
+            sort_results=True,
+        )
+        limit = settings.MAX_HOSPITAL_RESULTS
+        return indices[0][:limit], distances[0][:limit] * EARTH_RADIUS_KM
+
+    async def _fetch_raw(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float
+    ) -> Optional[List[Dict[str, Any]]]:
+        """One provider request for results within radius km of a point, or None if it failed"""
+        raise NotImplementedError
+
+    def _coordinates(self, item: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """Latitude and longitude of a raw result, or None to skip it"""
+        raise NotImplementedError
+
+    def _to_hospital(
+        self,
+        item: Dict[str, Any],
+        latitude: float,
+        longitude: float,
+        distance: float
+    ) -> Hospital:
+        """Hospital for a raw result (values are trusted, so model_construct is fine)"""
+        raise NotImplementedError
+
+    async def _find_with_fallback(
+        self,
+        location: LocationData,
+        radius: float
+    ) -> List[Hospital]:
+        """Fallback method when the provider is not available"""
+        logger.info("Using fallback hospital generation for %s, %s", location.latitude, location.longitude)
+
+        hospitals = []
+
+        # Generate 3-5 hospitals within radius
+        num_hospitals = int(self._rng.integers(3, 6))
+        logger.info("Generating %d fallback hospitals", num_hospitals)
+
+        # Random offsets within radius and every other random field drawn
+        # for all hospitals at once, then all distances in one pass
+        max_offset = radius / 111.0  # Rough km to degrees conversion
+        lats = location.latitude + self._rng.uniform(-max_offset, max_offset, size=num_hospitals)
+        lons = location.longitude + self._rng.uniform(-max_offset, max_offset, size=num_hospitals)
+        distances = haversine_km(location.latitude, location.longitude, lats, lons)
+        names = self._rng.integers(0, len(_FALLBACK_HOSPITAL_NAMES), size=num_hospitals).tolist()
+        streets = self._rng.integers(100, 10000, size=num_hospitals).tolist()
+        phones = self._rng.integers(1000, 10000, size=num_hospitals).tolist()
+
+        # Built closest first, so no sort is needed afterwards
+        for i in np.argsort(distances, kind="stable").tolist():
+            distance = float(distances[i])
+            hospital_name = f"{_FALLBACK_HOSPITAL_NAMES[names[i]]} #{i+1}"
+
+            hospital = Hospital.model_construct(
+                id=f"fallback_{i+1:03d}",
+                name=hospital_name,
+                address=f"{streets[i]} Medical Dr, Local City",
+                phone=f"+1-555-{phones[i]}",
+                distance=distance,
+                location=LocationData.model_construct(
+                    latitude=float(lats[i]),
+                    longitude=float(lons[i]),
+                    address=f"Near {location.latitude:.4f}, {location.longitude:.4f}"
+                ),
+                specialties=["Emergency", "General Medicine"]
+            )
+            hospitals.append(hospital)
+            logger.info("Generated fallback hospital: %s at %.1fkm", hospital_name, distance)
+
+        return hospitals
@@ -0,0 +1,201 @@
+"""
+LIFELINE AI - Hospital Search Cache
+Geohash-bucketed TTL cache for hospital lookups
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+import math
+import time
+import numpy as np
+
+from app.models.schemas import LocationData, Hospital
+from app.services.location.geo import haversine_distance_km, haversine_km_prepared, prepare_points
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision 7 geohash cells are roughly 150m x 150m
+SEARCH_KEY_PRECISION = 7
+
+# Precision 5 geohash cells are roughly 4.9km x 4.9km
+RESPONSE_KEY_PRECISION = 5
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = SEARCH_KEY_PRECISION) -> str:
+    """Encode a coordinate as a geohash string of the given length"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            value_range, value = lon_range, longitude
+        else:
+            value_range, value = lat_range, latitude
+
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            value_range[0] = mid
+        else:
+            bits = bits * 2
+            value_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_decode(geohash: str) -> Tuple[float, float, float, float]:
+    """Center latitude and longitude of a geohash cell, and its half-height and half-width in degrees"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        bits = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+
+    return (
+        (lat_range[0] + lat_range[1]) / 2,
+        (lon_range[0] + lon_range[1]) / 2,
+        (lat_range[1] - lat_range[0]) / 2,
+        (lon_range[1] - lon_range[0]) / 2,
+    )
+
+
+def response_cache_area(location: LocationData, radius: float) -> Tuple[Tuple[str, int], float, float, float]:
+    """
+    Cache key, query center and query radius (km) for raw provider responses
+    
+    Searches from anywhere in the same ~5km cell with the same whole-km
+    radius share one response. It is fetched around the cell center with a
+    radius widened to cover every point of the cell, so it holds everything
+    within radius of any user in the cell; callers filter by exact distance.
+    """
+    cell = geohash_encode(location.latitude, location.longitude, RESPONSE_KEY_PRECISION)
+    center_lat, center_lon, half_lat, half_lon = geohash_decode(cell)
+    radius_bucket = math.ceil(radius)
+    to_corner = max(
+        haversine_distance_km(center_lat, center_lon, center_lat + half_lat, center_lon + half_lon),
+        haversine_distance_km(center_lat, center_lon, center_lat - half_lat, center_lon + half_lon),
+    )
+    return (cell, radius_bucket), center_lat, center_lon, radius_bucket + to_corner
+
+
+def search_cache_key(location: LocationData, radius: float) -> Tuple[str, float]:
+    """Cache key shared by searches from the same ~150m cell with the same radius"""
+    return (
+        geohash_encode(location.latitude, location.longitude),
+        round(radius, 1),
+    )
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class SearchRegionIndex:
+    """
+    Completed hospital searches bucketed by ~1km grid cell, used to answer
+    nearest-hospital lookups near a previous search without searching again
+    """
+
+    # Grid cell size in degrees (~1.1km of latitude)
+    CELL_DEGREES = 0.01
+    # Most recent searches kept per cell
+    MAX_SEARCHES_PER_CELL = 8
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cells = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _cell(self, location: LocationData) -> Tuple[int, int]:
+        return (
+            int(location.latitude // self.CELL_DEGREES),
+            int(location.longitude // self.CELL_DEGREES),
+        )
+
+    def add(self, location: LocationData, radius: float, hospitals: List[Hospital], limit: int):
+        """
+        Record a search; results must come from a provider (never generated
+        ones), be complete within radius (the radius actually queried), sorted
+        and capped at limit
+        """
+        if not hospitals:
+            return
+
+        # Every hospital within this distance of the search center is in the results
+        coverage = radius if len(hospitals) < limit else hospitals[-1].distance
+
+        search = (
+            location.latitude,
+            location.longitude,
+            coverage,
+            # Hospital coordinates are fixed, so their trig is done once here
+            # rather than on every lookup
+            prepare_points(
+                np.array([h.location.latitude for h in hospitals], dtype=np.float64),
+                np.array([h.location.longitude for h in hospitals], dtype=np.float64),
+            ),
+            hospitals,
+        )
+        key = self._cell(location)
+        searches = self._cells.get(key) or []
+        self._cells.set(key, ([search] + searches)[:self.MAX_SEARCHES_PER_CELL])
+
+    def nearest(self, location: LocationData, radius: float) -> Optional[Hospital]:
+        """Nearest known hospital within radius, or None unless a covering search proves it is the nearest"""
+        for center_lat, center_lon, coverage, points, hospitals in self._cells.get(self._cell(location)) or []:
+            distances = haversine_km_prepared(location.latitude, location.longitude, *points)
+            index = int(np.argmin(distances))
+            to_center = haversine_distance_km(location.latitude, location.longitude, center_lat, center_lon)
+
+            # The whole disk around the user reaching this hospital was searched
+            if distances[index] <= radius and to_center + distances[index] <= coverage:
+                return hospitals[index].model_copy(
+                    update={"distance": float(distances[index])},
+                    deep=True,
+                )
+
+        return None
@@ -0,0 +1,171 @@
+"""
+LIFELINE AI - Geo Utilities
+Vectorized distance helpers shared by the hospital finders
+"""
+
+from typing import Optional, Tuple
+import math
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:  # numexpr is optional; NumPy handles every size
+    numexpr = None
+
+EARTH_RADIUS_KM = 6371.0
+
+# From this many points the Haversine tail runs as one fused, multithreaded
+# numexpr pass instead of separate NumPy ufunc passes over memory
+NUMEXPR_MIN_POINTS = 20_000
+
+# Floating-point slack on the flat-earth prefilter, which is a lower bound
+# on the true distance (see nearest_within)
+_EQUIRECTANGULAR_MARGIN = 1.0 + 1e-9
+
+
+def _haversine_combine(dlat: np.ndarray, dlon: np.ndarray, cos_product) -> np.ndarray:
+    """Finish the Haversine formula from coordinate differences in radians (reuses dlat and dlon)"""
+    if numexpr is not None and dlat.size >= NUMEXPR_MIN_POINTS:
+        a = numexpr.evaluate(
+            "sin(dlat * 0.5) ** 2 + cos_product * sin(dlon * 0.5) ** 2",
+            local_dict={"dlat": dlat, "dlon": dlon, "cos_product": cos_product},
+            out=dlat,
+        )
+        return numexpr.evaluate(
+            "diameter * arcsin(sqrt(where(a > 1.0, 1.0, a)))",
+            local_dict={"a": a, "diameter": 2 * EARTH_RADIUS_KM},
+            out=a,
+        )
+
+    dlat *= 0.5
+    np.sin(dlat, out=dlat)
+    np.square(dlat, out=dlat)
+    dlon *= 0.5
+    np.sin(dlon, out=dlon)
+    np.square(dlon, out=dlon)
+    dlon *= cos_product
+    a = dlat
+    a += dlon
+
+    # Rounding can push a just past 1 for antipodal points
+    np.sqrt(a, out=a)
+    np.minimum(a, 1.0, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * EARTH_RADIUS_KM
+    return a
+
+
+def haversine_km(
+    lat1: float,
+    lon1: float,
+    lats: np.ndarray,
+    lons: np.ndarray
+) -> np.ndarray:
+    """Distances in kilometers from one point to arrays of points (Haversine formula)"""
+    # The origin terms are scalars, and the array terms are updated in
+    # place, so only the two radian arrays are allocated
+    lat1_r = math.radians(lat1)
+    lats_r = np.radians(lats)
+    dlat = lats_r - lat1_r
+    dlon = np.radians(lons)
+    dlon -= math.radians(lon1)
+
+    np.cos(lats_r, out=lats_r)
+    lats_r *= math.cos(lat1_r)
+    return _haversine_combine(dlat, dlon, lats_r)
+
+
+def prepare_points(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Latitudes and longitudes in radians plus latitude cosines, for repeated haversine_km_prepared calls"""
+    lats_r = np.radians(lats)
+    return lats_r, np.radians(lons), np.cos(lats_r)
+
+
+def haversine_km_prepared(
+    lat1: float,
+    lon1: float,
+    lats_r: np.ndarray,
+    lons_r: np.ndarray,
+    cos_lats: np.ndarray
+) -> np.ndarray:
+    """haversine_km for points from prepare_points, skipping their per-call radians and cosine"""
+    lat1_r = math.radians(lat1)
+    return _haversine_combine(
+        lats_r - lat1_r,
+        lons_r - math.radians(lon1),
+        cos_lats * math.cos(lat1_r),
+    )
+
+
+def haversine_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance in kilometers between two points (scalar Haversine formula)"""
+    # Each radian conversion and half-angle sine is computed once and
+    # squared by multiplication rather than ** 2
+    lat1_r = math.radians(lat1)
+    lat2_r = math.radians(lat2)
+    sin_dlat = math.sin((lat2_r - lat1_r) * 0.5)
+    sin_dlon = math.sin(math.radians(lon2 - lon1) * 0.5)
+    a = sin_dlat * sin_dlat + math.cos(lat1_r) * math.cos(lat2_r) * sin_dlon * sin_dlon
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def equirectangular_km(
+    lat1: float,
+    lon1: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    lon_scale: Optional[float] = None
+) -> np.ndarray:
+    """
+    Approximate distances in kilometers (flat-earth projection, no per-point trig)
+    
+    Longitude differences are scaled by lon_scale, cos(lat1) by default.
+    """
+    lat1_r = math.radians(lat1)
+    if lon_scale is None:
+        lon_scale = math.cos(lat1_r)
+    y = np.radians(lats)
+    y -= lat1_r
+    x = np.radians(lons)
+    x -= math.radians(lon1)
+    # Wrap longitude differences across the antimeridian
+    x += math.pi
+    np.mod(x, 2 * math.pi, out=x)
+    x -= math.pi
+    x *= lon_scale
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+def nearest_within(
+    lat1: float,
+    lon1: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    radius: float,
+    limit: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices of the points within radius km, closest first, and their distances
+    
+    The cheap projection discards far points, so the exact Haversine
+    distance is only computed for the candidates that might be in range.
+    Longitudes are scaled by the smallest latitude cosine within radius of
+    the origin, where every path to an in-range point lies, which makes
+    the projection never exceed the true distance of such a point.
+    With a limit, only the closest limit points are selected
+    (argpartition) and sorted, instead of sorting every candidate.
+    """
+    band_edge = min(math.pi / 2, abs(math.radians(lat1)) + radius / EARTH_RADIUS_KM)
+    candidates = np.flatnonzero(
+        equirectangular_km(lat1, lon1, lats, lons, lon_scale=math.cos(band_edge))
+        <= radius * _EQUIRECTANGULAR_MARGIN
+    )
+    distances = haversine_km(lat1, lon1, lats[candidates], lons[candidates])
+    
+    if limit is not None and len(distances) > limit:
+        closest = np.argpartition(distances, limit - 1)[:limit]
+        order = closest[np.argsort(distances[closest], kind="stable")]
+    else:
+        order = np.argsort(distances, kind="stable")
+    order = order[distances[order] <= radius]
+    return candidates[order], distances[order]
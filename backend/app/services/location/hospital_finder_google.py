@@ -3,179 +3,100 @@ LIFELINE AI - Hospital Finder Service
 Find nearby hospitals using Google Places API
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-import math
-import aiohttp
+import orjson
 
 from app.models.schemas import LocationData, Hospital
 from app.core.config import settings
+from app.services.location.base import BaseHospitalFinder, SearchResults
+from app.services.location.http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
 
-class HospitalFinder:
+class GoogleHospitalFinder(BaseHospitalFinder):
     """Find nearby hospitals using Google Places API"""
     
+    PROVIDER_NAME = "Google Places"
+    # Nearby Search rejects radii over 50 000 m and returns at most 20
+    # results per page
+    MAX_QUERY_RADIUS_KM = 50.0
+    MAX_QUERY_RESULTS = 20
+    
     def __init__(self):
+        super().__init__()
         self.google_api_key = settings.GOOGLE_PLACES_API_KEY
         self.google_enabled = settings.GOOGLE_PLACES_ENABLED and bool(self.google_api_key)
-        
-    async def find_nearby(
-        self,
-        location: LocationData,
-        radius: float = 10.0
-    ) -> List[Hospital]:
-        """
-        Find nearby hospitals using Google Places API or fallback
-        """
-        try:
-            if self.google_enabled:
-                return await self._find_with_google_places(location, radius)
-            else:
-                return await self._find_with_fallback(location, radius)
-        except Exception as e:
-            logger.error(f"Hospital search error: {str(e)}")
-            return await self._find_with_fallback(location, radius)
     
-    async def _find_with_google_places(
+    async def _find(
         self,
         location: LocationData,
         radius: float
-    ) -> List[Hospital]:
-        """Find hospitals using Google Places API"""
-        try:
-            # Convert radius from km to meters
-            radius_meters = int(radius * 1000)
-            
-            url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-            params = {
-                "location": f"{location.latitude},{location.longitude}",
-                "radius": radius_meters,
-                "type": "hospital",
-                "key": self.google_api_key
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"Google Places API error: {response.status}")
-                        return await self._find_with_fallback(location, radius)
-                    
-                    data = await response.json()
-                    
-                    if data.get("status") != "OK":
-                        logger.error(f"Google Places API status: {data.get('status')}")
-                        return await self._find_with_fallback(location, radius)
-                    
-                    hospitals = []
-                    for place in data.get("results", []):
-                        try:
-                            place_location = place.get("geometry", {}).get("location", {})
-                            
-                            distance = self._calculate_distance(
-                                location.latitude,
-                                location.longitude,
-                                place_location.get("lat", 0),
-                                place_location.get("lng", 0)
-                            )
-                            
-                            hospital = Hospital(
-                                id=place.get("place_id", f"google_{len(hospitals)}"),
-                                name=place.get("name", "Unknown Hospital"),
-                                address=place.get("vicinity", "Address not available"),
-                                phone="Phone not available",
-                                distance=distance,
-                                location=LocationData(
-                                    latitude=place_location.get("lat", 0),
-                                    longitude=place_location.get("lng", 0),
-                                    address=place.get("vicinity", "")
-                                ),
-                                specialties=["Emergency", "General Medicine"]
-                            )
-                            hospitals.append(hospital)
-                        except Exception as e:
-                            logger.warning(f"Error processing place: {e}")
-                            continue
-                    
-                    # Sort by distance
-                    hospitals.sort(key=lambda x: x.distance)
-                    
-                    logger.info(f"Found {len(hospitals)} hospitals via Google Places API")
-                    return hospitals[:settings.MAX_HOSPITAL_RESULTS]
-                    
-        except Exception as e:
-            logger.error(f"Google Places API error: {str(e)}")
-            return await self._find_with_fallback(location, radius)
+    ) -> SearchResults:
+        """Google Places hospitals, with no hospitals if it is disabled or failed"""
+        if not self.google_enabled:
+            return SearchResults([], radius, False)
+        
+        return await super()._find(location, radius)
     
-    async def _find_with_fallback(
+    async def _fetch_raw(
         self,
-        location: LocationData,
+        latitude: float,
+        longitude: float,
         radius: float
-    ) -> List[Hospital]:
-        """Fallback method when Google Places API is not available"""
-        logger.info("Using fallback hospital generation")
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Places results within radius km of a point, or None if the API failed"""
+        # Convert radius from km to meters, within the API's limit
+        radius_meters = min(int(radius * 1000), int(self.MAX_QUERY_RADIUS_KM * 1000))
         
-        import random
-        hospitals = []
-        hospital_names = [
-            "General Hospital", "Medical Center", "Community Hospital", 
-            "Regional Medical Center", "Emergency Hospital", "City Hospital"
-        ]
+        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+        params = {
+            "location": f"{latitude},{longitude}",
+            "radius": radius_meters,
+            "type": "hospital",
+            "key": self.google_api_key
+        }
         
-        # Generate 3-5 hospitals within radius
-        for i in range(random.randint(3, 5)):
-            # Random offset within radius
-            max_offset = radius / 111.0  # Rough km to degrees conversion
-            lat_offset = random.uniform(-max_offset, max_offset)
-            lon_offset = random.uniform(-max_offset, max_offset)
+        async with get_http_session().get(url, params=params) as response:
+            if response.status != 200:
+                logger.error("Google Places API error: %s", response.status)
+                return None
             
-            distance = self._calculate_distance(
-                location.latitude,
-                location.longitude,
-                location.latitude + lat_offset,
-                location.longitude + lon_offset
-            )
-            
-            hospital = Hospital(
-                id=f"fallback_{i+1:03d}",
-                name=f"{random.choice(hospital_names)} #{i+1}",
-                address=f"{random.randint(100, 9999)} Medical Dr, Local City",
-                phone=f"+1-555-{random.randint(1000, 9999)}",
-                distance=distance,
-                location=LocationData(
-                    latitude=location.latitude + lat_offset,
-                    longitude=location.longitude + lon_offset,
-                    address=f"Near {location.latitude:.4f}, {location.longitude:.4f}"
-                ),
-                specialties=["Emergency", "General Medicine"]
-            )
-            hospitals.append(hospital)
+            data = orjson.loads(await response.read())
         
-        hospitals.sort(key=lambda x: x.distance)
-        return hospitals
-    
-    def _calculate_distance(
-        self,
-        lat1: float,
-        lon1: float,
-        lat2: float,
-        lon2: float
-    ) -> float:
-        """Calculate distance between two coordinates in kilometers (Haversine formula)"""
-        R = 6371  # Earth radius in kilometers
+        if data.get("status") != "OK":
+            logger.error("Google Places API status: %s", data.get("status"))
+            return None
         
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        return data.get("results", [])
+    
+    def _coordinates(self, place: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """Place geometry, or None for results without a position"""
+        place_location = place.get("geometry", {}).get("location", {})
+        if "lat" not in place_location or "lng" not in place_location:
+            return None
         
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(math.radians(lat1)) *
-            math.cos(math.radians(lat2)) *
-            math.sin(dlon / 2) ** 2
+        return place_location["lat"], place_location["lng"]
+    
+    def _to_hospital(
+        self,
+        place: Dict[str, Any],
+        latitude: float,
+        longitude: float,
+        distance: float
+    ) -> Hospital:
+        """Hospital from a Places result"""
+        return Hospital.model_construct(
+            id=place.get("place_id", f"google_{latitude:.6f}_{longitude:.6f}"),
+            name=place.get("name", "Unknown Hospital"),
+            address=place.get("vicinity", "Address not available"),
+            phone="Phone not available",
+            distance=distance,
+            location=LocationData.model_construct(
+                latitude=latitude,
+                longitude=longitude,
+                address=place.get("vicinity", "")
+            ),
+            specialties=["Emergency", "General Medicine"]
         )
-        
-        c = 2 * math.asin(math.sqrt(a))
-        distance = R * c
-        
-        return distance
\ No newline at end of file
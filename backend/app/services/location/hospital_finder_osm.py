@@ -3,227 +3,131 @@ LIFELINE AI - Hospital Finder Service
 Find nearby hospitals using OpenStreetMap Overpass API
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-import math
-import aiohttp
+import orjson
 
 from app.models.schemas import LocationData, Hospital
-from app.core.config import settings
+from app.services.location.base import BaseHospitalFinder
+from app.services.location.http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
+# Overpass QL for hospital nodes, ways and relations around a point, as
+# (radius_meters, latitude, longitude) three times; sent as bytes
+_OVERPASS_QUERY = (
+    b'[out:json][timeout:25];('
+    b'node["amenity"="hospital"](around:%d,%f,%f);'
+    b'way["amenity"="hospital"](around:%d,%f,%f);'
+    b'relation["amenity"="hospital"](around:%d,%f,%f);'
+    b');out center meta;'
+)
 
-class HospitalFinder:
+# Compressed responses are several times smaller (aiohttp decodes them)
+_OVERPASS_HEADERS = {"Content-Type": "text/plain", "Accept-Encoding": "gzip, deflate"}
+
+
+class OSMHospitalFinder(BaseHospitalFinder):
     """Find nearby hospitals using OpenStreetMap Overpass API"""
     
+    PROVIDER_NAME = "OSM"
+    
     def __init__(self):
+        super().__init__()
         self.overpass_url = "https://overpass-api.de/api/interpreter"
-        
-    async def find_nearby(
-        self,
-        location: LocationData,
-        radius: float = 10.0
-    ) -> List[Hospital]:
-        """
-        Find nearby hospitals using OSM Overpass API
-        """
-        try:
-            return await self._find_with_overpass(location, radius)
-        except Exception as e:
-            logger.error(f"OSM hospital search error: {str(e)}")
-            return await self._find_with_fallback(location, radius)
-    
-    async def _find_with_overpass(
-        self,
-        location: LocationData,
-        radius: float
-    ) -> List[Hospital]:
-        """Find hospitals using OSM Overpass API"""
-        try:
-            # Convert radius to meters
-            radius_meters = int(radius * 1000)
-            
-            logger.info(f"Querying OSM for hospitals within {radius_meters}m of {location.latitude}, {location.longitude}")
-            
-            # Overpass QL query for hospitals
-            query = f"""
-            [out:json][timeout:25];
-            (
-              node["amenity"="hospital"](around:{radius_meters},{location.latitude},{location.longitude});
-              way["amenity"="hospital"](around:{radius_meters},{location.latitude},{location.longitude});
-              relation["amenity"="hospital"](around:{radius_meters},{location.latitude},{location.longitude});
-            );
-            out center meta;
-            """
-            
-            logger.info(f"OSM Query: {query.strip()}")
-            
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.post(
-                    self.overpass_url,
-                    data=query,
-                    headers={"Content-Type": "text/plain"}
-                ) as response:
-                    logger.info(f"OSM API Response Status: {response.status}")
-                    
-                    if response.status != 200:
-                        response_text = await response.text()
-                        logger.error(f"Overpass API error {response.status}: {response_text}")
-                        return await self._find_with_fallback(location, radius)
-                    
-                    data = await response.json()
-                    logger.info(f"OSM API returned {len(data.get('elements', []))} elements")
-                    
-                    hospitals = []
-                    for element in data.get("elements", []):
-                        try:
-                            # Get coordinates
-                            if element["type"] == "node":
-                                lat, lon = element["lat"], element["lon"]
-                            elif "center" in element:
-                                lat, lon = element["center"]["lat"], element["center"]["lon"]
-                            else:
-                                logger.warning(f"Skipping element without coordinates: {element.get('id')}")
-                                continue
-                            
-                            # Calculate distance
-                            distance = self._calculate_distance(
-                                location.latitude, location.longitude, lat, lon
-                            )
-                            
-                            # Get hospital info
-                            tags = element.get("tags", {})
-                            name = tags.get("name", f"Hospital {element.get('id', 'Unknown')}")
-                            
-                            # Build address
-                            address_parts = []
-                            if tags.get("addr:housenumber"):
-                                address_parts.append(tags["addr:housenumber"])
-                            if tags.get("addr:street"):
-                                address_parts.append(tags["addr:street"])
-                            if tags.get("addr:city"):
-                                address_parts.append(tags["addr:city"])
-                            
-                            address = ", ".join(address_parts) if address_parts else "Address not available"
-                            
-                            # Get phone
-                            phone = tags.get("phone", "Phone not available")
-                            
-                            # Get specialties
-                            specialties = ["Emergency"]
-                            if tags.get("healthcare:speciality"):
-                                specialties.extend(tags["healthcare:speciality"].split(";"))
-                            
-                            hospital = Hospital(
-                                id=f"osm_{element['id']}",
-                                name=name,
-                                address=address,
-                                phone=phone,
-                                distance=distance,
-                                location=LocationData(
-                                    latitude=lat,
-                                    longitude=lon,
-                                    address=address
-                                ),
-                                specialties=specialties
-                            )
-                            hospitals.append(hospital)
-                            logger.info(f"Added hospital: {name} at {distance:.1f}km")
-                            
-                        except Exception as e:
-                            logger.warning(f"Error processing OSM element {element.get('id')}: {e}")
-                            continue
-                    
-                    # Sort by distance
-                    hospitals.sort(key=lambda x: x.distance)
-                    
-                    logger.info(f"Found {len(hospitals)} hospitals via OSM")
-                    
-                    if len(hospitals) == 0:
-                        logger.warning("No hospitals found via OSM, using fallback")
-                        return await self._find_with_fallback(location, radius)
-                    
-                    return hospitals[:settings.MAX_HOSPITAL_RESULTS]
-                    
-        except Exception as e:
-            logger.error(f"OSM Overpass API error: {str(e)}")
-            return await self._find_with_fallback(location, radius)
     
-    async def _find_with_fallback(
+    async def _fetch_raw(
         self,
-        location: LocationData,
+        latitude: float,
+        longitude: float,
         radius: float
-    ) -> List[Hospital]:
-        """Fallback method when OSM API is not available"""
-        logger.info(f"Using fallback hospital generation for {location.latitude}, {location.longitude}")
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Overpass elements within radius km of a point, or None if the API failed"""
+        # Convert radius to meters
+        radius_meters = int(radius * 1000)
         
-        import random
-        hospitals = []
-        hospital_names = [
-            "General Hospital", "Medical Center", "Community Hospital", 
-            "Regional Medical Center", "Emergency Hospital", "City Hospital"
-        ]
+        logger.info("Querying OSM for hospitals within %dm of %s, %s", radius_meters, latitude, longitude)
         
-        # Generate 3-5 hospitals within radius
-        num_hospitals = random.randint(3, 5)
-        logger.info(f"Generating {num_hospitals} fallback hospitals")
+        # Overpass QL query for hospitals
+        query = _OVERPASS_QUERY % ((radius_meters, latitude, longitude) * 3)
         
-        for i in range(num_hospitals):
-            # Random offset within radius
-            max_offset = radius / 111.0  # Rough km to degrees conversion
-            lat_offset = random.uniform(-max_offset, max_offset)
-            lon_offset = random.uniform(-max_offset, max_offset)
-            
-            distance = self._calculate_distance(
-                location.latitude,
-                location.longitude,
-                location.latitude + lat_offset,
-                location.longitude + lon_offset
-            )
+        logger.debug("OSM Query: %s", query)
+        
+        async with get_http_session().post(
+            self.overpass_url,
+            data=query,
+            headers=_OVERPASS_HEADERS
+        ) as response:
+            logger.info("OSM API Response Status: %s", response.status)
             
-            hospital_name = f"{random.choice(hospital_names)} #{i+1}"
+            if response.status != 200:
+                response_text = await response.text()
+                logger.error("Overpass API error %s: %s", response.status, response_text)
+                return None
             
-            hospital = Hospital(
-                id=f"fallback_{i+1:03d}",
-                name=hospital_name,
-                address=f"{random.randint(100, 9999)} Medical Dr, Local City",
-                phone=f"+1-555-{random.randint(1000, 9999)}",
-                distance=distance,
-                location=LocationData(
-                    latitude=location.latitude + lat_offset,
-                    longitude=location.longitude + lon_offset,
-                    address=f"Near {location.latitude:.4f}, {location.longitude:.4f}"
-                ),
-                specialties=["Emergency", "General Medicine"]
-            )
-            hospitals.append(hospital)
-            logger.info(f"Generated fallback hospital: {hospital_name} at {distance:.1f}km")
+            # orjson parses the raw bytes directly, several times faster
+            # than aiohttp's stdlib json on large element lists
+            data = orjson.loads(await response.read())
         
-        hospitals.sort(key=lambda x: x.distance)
-        return hospitals
+        elements = data.get("elements", [])
+        logger.info("OSM API returned %d elements", len(elements))
+        return elements
     
-    def _calculate_distance(
+    def _coordinates(self, element: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """Node position, or the center Overpass computed for ways and relations"""
+        try:
+            if element["type"] == "node":
+                return element["lat"], element["lon"]
+            if "center" in element:
+                return element["center"]["lat"], element["center"]["lon"]
+        except (KeyError, TypeError) as e:
+            logger.warning("Error processing OSM element %s: %s", element.get("id"), e)
+            return None
+        
+        logger.warning("Skipping element without coordinates: %s", element.get("id"))
+        return None
+    
+    def _to_hospital(
         self,
-        lat1: float,
-        lon1: float,
-        lat2: float,
-        lon2: float
-    ) -> float:
-        """Calculate distance between two coordinates in kilometers (Haversine formula)"""
-        R = 6371  # Earth radius in kilometers
+        element: Dict[str, Any],
+        latitude: float,
+        longitude: float,
+        distance: float
+    ) -> Hospital:
+        """Hospital from an element's OSM tags"""
+        # Get hospital info
+        tags = element.get("tags", {})
+        name = tags.get("name", f"Hospital {element.get('id', 'Unknown')}")
         
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        # Build address
+        address_parts = []
+        if tags.get("addr:housenumber"):
+            address_parts.append(tags["addr:housenumber"])
+        if tags.get("addr:street"):
+            address_parts.append(tags["addr:street"])
+        if tags.get("addr:city"):
+            address_parts.append(tags["addr:city"])
         
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(math.radians(lat1)) *
-            math.cos(math.radians(lat2)) *
-            math.sin(dlon / 2) ** 2
-        )
+        address = ", ".join(address_parts) if address_parts else "Address not available"
         
-        c = 2 * math.asin(math.sqrt(a))
-        distance = R * c
+        # Get phone
+        phone = tags.get("phone", "Phone not available")
         
-        return distance
\ No newline at end of file
+        # Get specialties
+        specialties = ["Emergency"]
+        if tags.get("healthcare:speciality"):
+            specialties.extend(tags["healthcare:speciality"].split(";"))
+        
+        return Hospital.model_construct(
+            id=f"osm_{element['id']}",
+            name=name,
+            address=address,
+            phone=phone,
+            distance=distance,
+            location=LocationData.model_construct(
+                latitude=latitude,
+                longitude=longitude,
+                address=address
+            ),
+            specialties=specialties
+        )
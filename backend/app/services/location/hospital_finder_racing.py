@@ -0,0 +1,67 @@
+"""
+LIFELINE AI - Hospital Finder Service
+Find nearby hospitals by racing OpenStreetMap against Google Places
+"""
+
+import asyncio
+import logging
+
+from app.models.schemas import LocationData
+from app.core.config import settings
+from app.services.location.base import SearchResults
+from app.services.location.hospital_finder_google import GoogleHospitalFinder
+from app.services.location.hospital_finder_osm import OSMHospitalFinder
+
+logger = logging.getLogger(__name__)
+
+
+class RacingHospitalFinder(OSMHospitalFinder):
+    """
+    OSM hospital finder that also queries Google Places (when a key is
+    configured) and answers with whichever provider returns hospitals first
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._google = GoogleHospitalFinder()
+
+    async def _find(
+        self,
+        location: LocationData,
+        radius: float
+    ) -> SearchResults:
+        """Race the providers; no hospitals if neither returns any in time"""
+        if not self._google.google_enabled:
+            return await super()._find(location, radius)
+
+        tasks = {
+            asyncio.create_task(self.search(location, radius)): self.PROVIDER_NAME,
+            asyncio.create_task(self._google.search(location, radius)): self._google.PROVIDER_NAME,
+        }
+        pending = set(tasks)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.HOSPITAL_SEARCH_TIMEOUT_SECONDS
+
+        try:
+            # A provider that fails or finds nothing returns no hospitals, so keep
+            # waiting for the other one instead of taking the first result
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, deadline - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.warning("Hospital providers timed out")
+                    break
+
+                for task in done:
+                    found = task.result()
+                    if found.hospitals:
+                        logger.info("Using %d hospitals from %s", len(found.hospitals), tasks[task])
+                        return found
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return SearchResults([], radius, False)
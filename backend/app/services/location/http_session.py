@@ -0,0 +1,33 @@
+"""
+LIFELINE AI - HTTP Session
+Process-wide aiohttp session shared by the hospital finders
+"""
+
+from functools import lru_cache
+import aiohttp
+
+# Connections kept open across hospital searches, and how long resolved
+# provider hostnames are reused
+HTTP_POOL_SIZE = 100
+DNS_CACHE_SECONDS = 300
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Shared ClientSession (created on first use, inside the running event loop)
+    
+    Reusing one session keeps connections to the map providers alive, so
+    repeat searches skip the DNS lookup and TCP/TLS handshakes.
+    """
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=30),
+        connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=DNS_CACHE_SECONDS),
+    )
+
+
+async def close_http_session():
+    """Close the shared session if one was created"""
+    if get_http_session.cache_info().currsize:
+        await get_http_session().close()
+        get_http_session.cache_clear()
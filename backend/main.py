@@ -3,18 +3,38 @@ LIFELINE AI - FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import orjson
+import sys
 import uvicorn
 
 from app.core.config import settings
 from app.api.v1.router import api_router
 from app.core.logging import setup_logging
+from app.api.deps import init_services, close_services, get_classifier
+from app.api.v1.endpoints.emergency import (
+    start_classification_batching,
+    stop_classification_batching,
+)
 
 # Setup logging
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize shared services once per worker at startup"""
+    init_services()
+    start_classification_batching(get_classifier())
+    yield
+    await stop_classification_batching()
+    await close_services()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -22,12 +42,15 @@ app = FastAPI(
     description="AI-powered emergency detection and first aid assistance API",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
+    allow_origin_regex=settings.CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -48,25 +71,42 @@ async def root():
     }
 
 
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "version": settings.VERSION,
+})
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "version": settings.VERSION,
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+
+# Outside DEBUG every unhandled error gets the same body, serialized once
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    "success": False,
+    "error": {
+        "code": "INTERNAL_SERVER_ERROR",
+        "message": "An internal error occurred",
+    },
+    "timestamp": None,
+})
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    return JSONResponse(
+    if not settings.DEBUG:
+        return Response(content=_INTERNAL_ERROR_BODY, status_code=500, media_type="application/json")
+    
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
             "error": {
                 "code": "INTERNAL_SERVER_ERROR",
-                "message": str(exc) if settings.DEBUG else "An internal error occurred",
+                "message": str(exc),
             },
             "timestamp": None,
         },
@@ -79,5 +119,10 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        # Reload mode supports a single process only
+        workers=settings.SERVER_PROCESSES,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info",
     )
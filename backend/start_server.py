@@ -20,12 +20,21 @@ def main():
     # Change to backend directory
     os.chdir(backend_dir)
     
-    # Start server with proper configuration
+    # Imported after the chdir so settings read the backend's .env
+    from app.core.config import settings
+    
+    # Start server with proper configuration; auto-reload (and its file
+    # watcher) only in DEBUG, otherwise one worker process per CPU
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",  # Allow external connections
-        port=8000,
-        reload=True,
+        host=settings.HOST,
+        port=settings.PORT,
+        reload=settings.DEBUG,
+        # Reload mode supports a single process only
+        workers=settings.SERVER_PROCESSES,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info",
         access_log=True,
     )
@@ -0,0 +1,9 @@
+"""
+LIFELINE AI - Test Configuration
+Make the backend package importable when pytest runs from backend/
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,82 @@
+"""
+LIFELINE AI - Classification Micro-Batching Tests
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.api.v1.endpoints import emergency
+from app.core.config import settings
+
+
+class FakeClassifier:
+    """Records each classify_batch call and echoes its contents back"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def classify_batch(self, input_types, contents):
+        self.calls.append(list(contents))
+        if self.error is not None:
+            raise self.error
+        return [{"type": content, "confidence": 1.0} for content in contents]
+
+
+def _request(content):
+    return SimpleNamespace(input=SimpleNamespace(type="text", content=content))
+
+
+async def _classify_concurrently(classifier, contents):
+    """Start the worker, classify each content in its own concurrent call, then stop it"""
+    emergency.start_classification_batching(classifier)
+    try:
+        return await asyncio.gather(
+            *(emergency._classify_batched(classifier, [_request(content)]) for content in contents),
+            return_exceptions=True,
+        )
+    finally:
+        await emergency.stop_classification_batching()
+
+
+def test_concurrent_calls_share_one_batch():
+    classifier = FakeClassifier()
+    contents = ["a", "b", "c"]
+
+    results = asyncio.run(_classify_concurrently(classifier, contents))
+
+    assert classifier.calls == [contents]
+    assert [result[0]["type"] for result in results] == contents
+
+
+def test_batches_are_capped_at_max_size():
+    classifier = FakeClassifier()
+    contents = [str(index) for index in range(settings.BATCH_MAX_SIZE + 3)]
+
+    results = asyncio.run(_classify_concurrently(classifier, contents))
+
+    assert [len(call) for call in classifier.calls] == [settings.BATCH_MAX_SIZE, 3]
+    assert [result[0]["type"] for result in results] == contents
+
+
+def test_batch_error_reaches_every_caller():
+    classifier = FakeClassifier(error=RuntimeError("model unavailable"))
+
+    results = asyncio.run(_classify_concurrently(classifier, ["a", "b"]))
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_direct_classification_when_worker_stopped():
+    classifier = FakeClassifier()
+
+    async def run():
+        emergency.start_classification_batching(classifier)
+        await emergency.stop_classification_batching()
+        return await emergency._classify_batched(classifier, [_request("a"), _request("b")])
+
+    results = asyncio.run(run())
+
+    assert emergency._classification_queue is None
+    assert classifier.calls == [["a", "b"]]
+    assert [result["type"] for result in results] == ["a", "b"]
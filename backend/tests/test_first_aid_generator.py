@@ -0,0 +1,104 @@
+"""
+LIFELINE AI - First Aid Generator Tests
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.ai import first_aid_generator
+from app.services.ai.first_aid_generator import (
+    _PREBUILT_DEFAULT,
+    _PREBUILT_TEMPLATES,
+    _TEMPLATE_CONTEXT,
+    FirstAidGenerator,
+)
+
+
+def _captured_messages(monkeypatch, emergency_type: str):
+    """Messages _stream_with_ai sends for one emergency type"""
+    captured = {}
+
+    async def fake_stream(client, **kwargs):
+        captured["messages"] = kwargs["messages"]
+        yield {"step": 1, "title": "Cool the burn", "description": "Run cool water over it."}
+
+    monkeypatch.setattr(first_aid_generator, "stream_json_array_items", fake_stream)
+    generator = FirstAidGenerator()
+    generator._aclient = object()
+
+    async def run():
+        return [step async for step in generator._stream_with_ai(emergency_type, "high")]
+
+    asyncio.run(run())
+    return captured["messages"]
+
+
+def test_template_context_sent_for_classifier_type(monkeypatch):
+    messages = _captured_messages(monkeypatch, "burn")
+
+    system_contents = [m["content"] for m in messages if m["role"] == "system"]
+    assert _TEMPLATE_CONTEXT["burns"] in system_contents
+
+
+def test_template_context_sent_for_template_name(monkeypatch):
+    messages = _captured_messages(monkeypatch, "cuts-wounds")
+
+    assert {"role": "system", "content": _TEMPLATE_CONTEXT["cuts-wounds"]} in messages
+
+
+def test_no_template_context_for_unmapped_type(monkeypatch):
+    messages = _captured_messages(monkeypatch, "poisoning")
+
+    assert [m["role"] for m in messages] == ["system", "user"]
+
+
+def test_stream_failure_after_first_step_is_raised(monkeypatch):
+    async def failing_stream(client, **kwargs):
+        yield {"step": 1, "title": "Cool the burn", "description": "Run cool water over it."}
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(first_aid_generator, "stream_json_array_items", failing_stream)
+    generator = FirstAidGenerator()
+    generator._aclient = object()
+    steps = []
+
+    async def run():
+        async for step in generator.stream_instructions("burn", "high"):
+            steps.append(step)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert [step.title for step in steps] == ["Cool the burn"]
+
+
+@pytest.mark.parametrize("emergency_type, template", [
+    ("burn", "burns"),
+    ("bleeding", "cuts-wounds"),
+    ("cardiac", "cpr"),
+    ("sprains", "sprains"),
+])
+def test_template_steps_for_classifier_type(emergency_type, template):
+    generator = FirstAidGenerator()
+    generator._aclient = None
+
+    steps = asyncio.run(generator.generate_instructions(emergency_type, "high"))
+    assert steps == list(_PREBUILT_TEMPLATES[template])
+
+
+def test_streamed_template_steps_for_classifier_type():
+    generator = FirstAidGenerator()
+    generator._aclient = None
+
+    async def run():
+        return [step async for step in generator.stream_instructions("cardiac", "critical")]
+
+    assert asyncio.run(run()) == list(_PREBUILT_TEMPLATES["cpr"])
+
+
+def test_default_steps_for_unmapped_type():
+    generator = FirstAidGenerator()
+    generator._aclient = None
+
+    steps = asyncio.run(generator.generate_instructions("poisoning", "high"))
+    assert steps == list(_PREBUILT_DEFAULT)
@@ -0,0 +1,49 @@
+"""
+LIFELINE AI - Geo Utilities Tests
+"""
+
+import math
+
+import numpy as np
+
+from app.services.location.geo import EARTH_RADIUS_KM, haversine_km, nearest_within
+
+
+def _destinations(lat: float, lon: float, distance_km: float, bearings_deg: np.ndarray):
+    """Points distance_km away from (lat, lon) along each bearing, on the sphere"""
+    lat_r = math.radians(lat)
+    angle = distance_km / EARTH_RADIUS_KM
+    bearings = np.radians(bearings_deg)
+    lats = np.arcsin(
+        math.sin(lat_r) * math.cos(angle)
+        + math.cos(lat_r) * math.sin(angle) * np.cos(bearings)
+    )
+    lons = math.radians(lon) + np.arctan2(
+        np.sin(bearings) * math.sin(angle) * math.cos(lat_r),
+        math.cos(angle) - math.sin(lat_r) * np.sin(lats),
+    )
+    return np.degrees(lats), np.degrees(lons)
+
+
+def test_points_just_inside_radius_kept_at_high_latitude():
+    bearings = np.arange(0, 360, 5, dtype=np.float64)
+    for lat in (60.0, 70.0, -60.0):
+        for radius in (50.0, 100.0, 150.0):
+            lats, lons = _destinations(lat, 10.0, radius * 0.999, bearings)
+            indices, distances = nearest_within(lat, 10.0, lats, lons, radius)
+            assert len(indices) == len(bearings), (lat, radius)
+            assert np.all(distances <= radius)
+
+
+def test_matches_brute_force_haversine_at_60_degrees():
+    rng = np.random.default_rng(0)
+    lats = 60.0 + rng.uniform(-2.0, 2.0, 5000)
+    lons = 10.0 + rng.uniform(-4.0, 4.0, 5000)
+    radius = 100.0
+
+    indices, distances = nearest_within(60.0, 10.0, lats, lons, radius)
+
+    exact = haversine_km(60.0, 10.0, lats, lons)
+    expected = np.flatnonzero(exact <= radius)
+    assert set(indices.tolist()) == set(expected.tolist())
+    assert np.all(np.diff(distances) >= 0)
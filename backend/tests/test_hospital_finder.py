@@ -0,0 +1,86 @@
+"""
+LIFELINE AI - Hospital Finder Tests
+"""
+
+import asyncio
+import math
+
+from app.models.schemas import Hospital, LocationData
+from app.services.location.base import BaseHospitalFinder
+from app.services.location.geo import EARTH_RADIUS_KM, haversine_distance_km
+
+# Search origin, near the middle of a SearchRegionIndex cell
+ORIGIN = LocationData(latitude=10.005, longitude=20.005)
+
+
+def _west_of(location: LocationData, distance_km: float):
+    """Coordinates about distance_km due west of a location"""
+    km_per_degree = EARTH_RADIUS_KM * math.radians(1) * math.cos(math.radians(location.latitude))
+    return location.latitude, location.longitude - distance_km / km_per_degree
+
+
+class FakeFinder(BaseHospitalFinder):
+    """Provider returning fixed results and recording each query radius"""
+
+    PROVIDER_NAME = "Fake"
+
+    def __init__(self, items, max_query_radius_km=None):
+        super().__init__()
+        self.items = items
+        self.MAX_QUERY_RADIUS_KM = max_query_radius_km
+        self.query_radii = []
+
+    async def _fetch_raw(self, latitude, longitude, radius):
+        self.query_radii.append(radius)
+        return self.items
+
+    def _coordinates(self, item):
+        return item["lat"], item["lon"]
+
+    def _to_hospital(self, item, latitude, longitude, distance):
+        if item.get("broken"):
+            raise ValueError("unreadable result")
+        return Hospital.model_construct(
+            id=item["id"],
+            name=item["id"],
+            address="",
+            phone="",
+            distance=distance,
+            location=LocationData.model_construct(latitude=latitude, longitude=longitude, address=""),
+            specialties=[],
+        )
+
+
+def test_clamped_query_only_covers_the_queried_radius():
+    lat, lon = _west_of(ORIGIN, 49.8)
+    finder = FakeFinder([{"id": "far", "lat": lat, "lon": lon}], max_query_radius_km=50.0)
+
+    found = asyncio.run(finder.search(ORIGIN, 100.0))
+    assert finder.query_radii == [50.0]
+    assert found.radius == 50.0
+    assert [hospital.id for hospital in found.hospitals] == ["far"]
+
+    asyncio.run(finder.find_nearby(ORIGIN, 100.0))
+    # Same grid cell, a little further east: the hospital is within the
+    # requested 100km, but past what the clamped query proved empty
+    nearby = LocationData(latitude=10.005, longitude=20.009)
+    assert haversine_distance_km(nearby.latitude, nearby.longitude, lat, lon) <= 100.0
+    assert finder._regions.nearest(nearby, 100.0) is None
+    assert finder._regions.nearest(ORIGIN, 100.0).id == "far"
+
+
+def test_dropped_result_keeps_search_out_of_region_index():
+    near_lat, near_lon = _west_of(ORIGIN, 2.0)
+    far_lat, far_lon = _west_of(ORIGIN, 5.0)
+    finder = FakeFinder([
+        {"id": "near", "lat": near_lat, "lon": near_lon, "broken": True},
+        {"id": "far", "lat": far_lat, "lon": far_lon},
+    ])
+
+    found = asyncio.run(finder.search(ORIGIN, 10.0))
+    assert [hospital.id for hospital in found.hospitals] == ["far"]
+    assert not found.complete
+
+    hospitals = asyncio.run(finder.find_nearby(ORIGIN, 10.0))
+    assert [hospital.id for hospital in hospitals] == ["far"]
+    assert finder._regions.nearest(ORIGIN, 10.0) is None
@@ -0,0 +1,59 @@
+"""
+LIFELINE AI - Keyword Matcher Tests
+"""
+
+import random
+
+import pytest
+
+from app.services.ai import emergency_classifier, severity_scorer
+from app.services.ai.keyword_matcher import KeywordMatcher
+
+KEYWORD_TABLES = [emergency_classifier.RULE_KEYWORDS, severity_scorer.RULE_KEYWORDS]
+
+TEXTS = [
+    "",
+    "I have a deep cut that won't stop bleeding",
+    "CHEMICAL BURN on my arm, it burns",
+    "He collapsed, he is unconscious and not breathing",
+    "My nose bleeding won't stop, bloody nose",
+    "twisted wrist and ankle, can't move it",
+    "she can't breathe, something stuck in throat",
+    "severe bleeding and severe pain in the chest pain area",
+    "scalded by hot steam from the kettle",
+    "cutcutcut woundwound",
+    "nothing in here matches",
+]
+
+
+def _substring_matches(keywords, text):
+    """Keywords found the way the rule classifiers used to check them"""
+    text_lower = text.lower()
+    return {keyword for keyword in keywords if keyword in text_lower}
+
+
+def _random_texts(keywords, count=300):
+    """Keywords and filler glued together at random, with random casing"""
+    rng = random.Random(0)
+    pieces = list(keywords) + ["the", "and", "a", "arm", "leg", "x", " ", ",", "'"]
+    texts = []
+    for _ in range(count):
+        text = "".join(rng.choice(pieces) + rng.choice(["", " "]) for _ in range(rng.randint(0, 12)))
+        texts.append("".join(c.upper() if rng.random() < 0.3 else c for c in text))
+    return texts
+
+
+@pytest.mark.parametrize("table", KEYWORD_TABLES)
+def test_matches_substring_checks(table):
+    keywords = {keyword for keyword_list in table.values() for keyword in keyword_list}
+    matcher = KeywordMatcher(keywords)
+
+    for text in TEXTS + _random_texts(keywords):
+        assert matcher.find(text) == _substring_matches(keywords, text), text
+
+
+def test_overlapping_keywords_are_all_found():
+    matcher = KeywordMatcher(["burn", "chemical burn", "chemical", "cal"])
+
+    assert matcher.find("Chemical burn") == {"burn", "chemical burn", "chemical", "cal"}
+    assert matcher.find("burning") == {"burn"}
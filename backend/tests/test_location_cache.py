@@ -0,0 +1,71 @@
+"""
+LIFELINE AI - Hospital Search Cache Tests
+"""
+
+import random
+import types
+
+import pytest
+
+from app.models.schemas import LocationData
+from app.services.location import cache
+from app.services.location.cache import TTLCache, geohash_decode, geohash_encode, search_cache_key
+
+
+def test_geohash_known_value():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+@pytest.mark.parametrize("precision", [1, 5, 7, 9])
+def test_geohash_round_trip(precision):
+    rng = random.Random(precision)
+    for _ in range(200):
+        latitude = rng.uniform(-90, 90)
+        longitude = rng.uniform(-180, 180)
+        geohash = geohash_encode(latitude, longitude, precision)
+        center_lat, center_lon, half_lat, half_lon = geohash_decode(geohash)
+
+        assert len(geohash) == precision
+        assert abs(latitude - center_lat) <= half_lat
+        assert abs(longitude - center_lon) <= half_lon
+        assert geohash_encode(center_lat, center_lon, precision) == geohash
+
+
+def test_search_cache_key_shared_within_cell():
+    near = search_cache_key(LocationData(latitude=40.71280, longitude=-74.00600), 10.0)
+    same_cell = search_cache_key(LocationData(latitude=40.71285, longitude=-74.00605), 10.04)
+    far = search_cache_key(LocationData(latitude=40.73000, longitude=-74.00600), 10.0)
+
+    assert near == same_cell
+    assert near != far
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_ttl_cache_expires_entries(clock):
+    ttl_cache = TTLCache(maxsize=4, ttl=60)
+    ttl_cache.set("key", "value")
+
+    clock[0] = 59.0
+    assert ttl_cache.get("key") == "value"
+    clock[0] = 61.0
+    assert ttl_cache.get("key") is None
+    # Expired entries are dropped, not just hidden
+    assert "key" not in ttl_cache._entries
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("c") == 3
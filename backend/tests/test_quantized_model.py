@@ -0,0 +1,50 @@
+"""
+LIFELINE AI - Quantized Model Tests
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from app.services.ai.quantized_model import QuantizedNBPipeline, quantize_pipeline
+
+TEXTS = [
+    "deep cut on my arm that keeps bleeding",
+    "blood everywhere from a wound on the leg",
+    "burned my hand on the stove",
+    "hot oil burn with blisters",
+    "he is choking and can't breathe",
+    "something stuck in her throat",
+    "twisted my ankle while running",
+    "swollen wrist after a fall",
+]
+LABELS = ["cuts-wounds", "cuts-wounds", "burns", "burns", "choking", "choking", "sprains", "sprains"]
+
+
+def _pipeline():
+    return Pipeline([
+        ("tfidf", TfidfVectorizer()),
+        ("classifier", MultinomialNB(alpha=0.1)),
+    ]).fit(TEXTS, LABELS)
+
+
+def test_predict_proba_matches_pipeline():
+    pipeline = _pipeline()
+    quantized = quantize_pipeline(pipeline)
+    assert isinstance(quantized, QuantizedNBPipeline)
+
+    queries = TEXTS + ["my finger is bleeding", "a small burn", "unrelated words only"]
+    expected = pipeline.predict_proba(queries)
+    actual = quantized.predict_proba(queries)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-2)
+    np.testing.assert_array_equal(actual.argmax(axis=1), expected.argmax(axis=1))
+
+
+def test_weights_stay_int8():
+    quantized = quantize_pipeline(_pipeline())
+
+    assert quantized.weights.dtype == np.int8
+    assert quantized._product_weights.dtype == np.float32
@@ -0,0 +1,127 @@
+"""
+LIFELINE AI - OpenAI Rate Limiter Tests
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from app.services.ai import rate_limiter
+from app.services.ai.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the limiter's view of time is faked; the event loop keeps the real clock
+    monkeypatch.setattr(rate_limiter, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch, clock):
+    """Waits requested by the limiter; each one advances the fake clock"""
+    waits = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        waits.append(delay)
+        clock.now += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    return waits
+
+
+def test_refill_is_proportional_and_capped(clock):
+    limiter = RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=600, max_concurrency=1)
+    limiter.available_request_capacity = 0.0
+    limiter.available_token_capacity = 0.0
+
+    clock.now = 30.0
+    limiter._refill()
+    assert limiter.available_request_capacity == pytest.approx(30.0)
+    assert limiter.available_token_capacity == pytest.approx(300.0)
+
+    clock.now = 1000.0
+    limiter._refill()
+    assert limiter.available_request_capacity == 60
+    assert limiter.available_token_capacity == 600
+
+
+def test_acquire_waits_for_the_token_deficit(clock, sleeps):
+    limiter = RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=600, max_concurrency=2)
+
+    async def run():
+        await limiter.acquire(500)
+        await limiter.acquire(200)
+
+    asyncio.run(run())
+    # 100 tokens remained; the other 100 refill at 10 per second
+    assert sleeps == [pytest.approx(10.0)]
+    assert limiter.available_token_capacity == pytest.approx(0.0)
+
+
+def test_acquire_waits_for_the_request_deficit(clock, sleeps):
+    limiter = RateLimiter(max_requests_per_minute=2, max_tokens_per_minute=600, max_concurrency=3)
+
+    async def run():
+        for _ in range(3):
+            await limiter.acquire(1)
+
+    asyncio.run(run())
+    # One request refills every 30 seconds
+    assert sleeps == [pytest.approx(30.0)]
+
+
+def test_single_call_is_capped_at_the_budget(clock, sleeps):
+    limiter = RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=600, max_concurrency=1)
+
+    async def run():
+        async with limiter.limit(10_000):
+            pass
+
+    asyncio.run(run())
+    assert sleeps == []
+
+
+def test_slot_released_when_waiting_acquire_is_cancelled(clock):
+    limiter = RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=600, max_concurrency=1)
+
+    async def run():
+        async with limiter.limit(600):
+            pass
+
+        # The clock is frozen, so this acquire sleeps until cancelled
+        waiting = asyncio.create_task(limiter.acquire(600))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(run())
+    assert not limiter._semaphore.locked()
+
+
+def test_slot_released_when_call_raises(clock):
+    limiter = RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=600, max_concurrency=1)
+
+    async def run():
+        with pytest.raises(ValueError):
+            async with limiter.limit(1):
+                raise ValueError("call failed")
+
+    asyncio.run(run())
+    assert not limiter._semaphore.locked()
@@ -0,0 +1,71 @@
+"""
+LIFELINE AI - TF-IDF Features Tests
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.services.ai.tfidf import TfidfFeatures
+
+CORPUS = [
+    "I have a deep cut that won't stop bleeding",
+    "Someone is having trouble breathing and is choking",
+    "Burned my hand on the stove, the burn is blistering",
+    "Twisted ankle, ankle is swollen",
+    "Nosebleed that keeps bleeding and bleeding",
+]
+
+QUERIES = CORPUS + [
+    "",
+    "words the vocabulary never saw",
+    "BLEEDING Cut on the ARM",
+    "the and is a",
+    "ankle ankle ankle ankle",
+]
+
+CONFIGS = [
+    {},
+    {"stop_words": "english", "sublinear_tf": True},
+    {"norm": "l1"},
+    {"norm": None},
+    {"use_idf": False},
+    {"lowercase": False},
+    {"ngram_range": (1, 2)},
+    {"max_features": 10, "dtype": np.float32},
+]
+
+
+@pytest.mark.parametrize("params", CONFIGS)
+def test_transform_matches_vectorizer(params):
+    vectorizer = TfidfVectorizer(**params).fit(CORPUS)
+    features = TfidfFeatures(vectorizer)
+
+    expected = vectorizer.transform(QUERIES)
+    actual = features.transform(QUERIES)
+
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    np.testing.assert_allclose(actual.toarray(), expected.toarray(), rtol=1e-6, atol=1e-7)
+
+
+@pytest.mark.parametrize("params", CONFIGS)
+def test_transform_one_matches_vectorizer(params):
+    vectorizer = TfidfVectorizer(**params).fit(CORPUS)
+    features = TfidfFeatures(vectorizer)
+
+    expected = vectorizer.transform(QUERIES).toarray()
+    for query, expected_row in zip(QUERIES, expected):
+        indices, values = features.transform_one(query)
+        row = np.zeros(features.n_features, dtype=expected_row.dtype)
+        row[indices] = values
+        np.testing.assert_allclose(row, expected_row, rtol=1e-6, atol=1e-7)
+
+
+def test_matches_compares_vocabulary_and_idf():
+    vectorizer = TfidfVectorizer().fit(CORPUS)
+    same = TfidfVectorizer().fit(CORPUS)
+    other = TfidfVectorizer().fit(CORPUS[:2])
+
+    assert TfidfFeatures(vectorizer).matches(TfidfFeatures(same))
+    assert not TfidfFeatures(vectorizer).matches(TfidfFeatures(other))
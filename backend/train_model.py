@@ -3,83 +3,215 @@ LIFELINE AI - Simple Emergency Classifier Training
 Minimal training setup for emergency classification
 """
 
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
+from joblib import Parallel, delayed, effective_n_jobs
+import argparse
 import joblib
 import json
+import os
 
-# Minimal training data
-training_data = [
-    ("I cut my finger with a knife, it's bleeding", "cuts-wounds", "moderate"),
-    ("My hand is burned from the stove", "burns", "high"),
-    ("Someone is choking on food", "choking", "critical"),
-    ("Person collapsed and not breathing", "cpr", "critical"),
-    ("Twisted my ankle playing sports", "sprains", "low"),
-    ("Nose won't stop bleeding", "nosebleed", "moderate"),
-    ("Having allergic reaction, face swelling", "allergic-reaction", "high"),
-    ("Feeling dizzy and about to faint", "fainting", "moderate"),
-    ("Deep cut on arm, blood everywhere", "cuts-wounds", "high"),
-    ("Severe burn from hot oil", "burns", "critical"),
-    ("Can't breathe, something stuck in throat", "choking", "critical"),
-    ("No pulse, unconscious", "cpr", "critical"),
-    ("Sprained wrist, very swollen", "sprains", "moderate"),
-    ("Heavy nosebleed after accident", "nosebleed", "high"),
-    ("Hives all over body, trouble breathing", "allergic-reaction", "critical"),
-    ("Passed out briefly", "fainting", "moderate"),
-    ("Small paper cut", "cuts-wounds", "low"),
-    ("Minor burn from touching hot pan", "burns", "low"),
-    ("Coughing but can still talk", "choking", "low"),
-    ("Person is breathing but unconscious", "cpr", "high"),
-    ("Mild ankle pain", "sprains", "low"),
-    ("Light nosebleed", "nosebleed", "low"),
-    ("Mild skin rash", "allergic-reaction", "low"),
-    ("Feeling lightheaded", "fainting", "low"),
-    # Add more variations
-    ("Bleeding wound on leg", "cuts-wounds", "moderate"),
-    ("Hot water spilled on skin", "burns", "moderate"),
-    ("Food stuck in throat", "choking", "high"),
-    ("Heart stopped beating", "cpr", "critical"),
-    ("Injured knee from fall", "sprains", "moderate"),
-    ("Blood from nose", "nosebleed", "low"),
-    ("Swollen face from allergy", "allergic-reaction", "high"),
-    ("Lost consciousness", "fainting", "high"),
-]
+from app.services.ai.onnx_model import export_onnx_pipeline
+from app.services.ai.tfidf import TfidfFeatures
+
+# Corpora with at least this many documents are tokenized in parallel
+PARALLEL_FIT_MIN_DOCS = 10_000
+
+def load_training_data():
+    """
+    Minimal training data as (text, category, severity) rows, built only
+    when training runs rather than whenever this module is imported
+    """
+    return [
+        ("I cut my finger with a knife, it's bleeding", "cuts-wounds", "moderate"),
+        ("My hand is burned from the stove", "burns", "high"),
+        ("Someone is choking on food", "choking", "critical"),
+        ("Person collapsed and not breathing", "cpr", "critical"),
+        ("Twisted my ankle playing sports", "sprains", "low"),
+        ("Nose won't stop bleeding", "nosebleed", "moderate"),
+        ("Having allergic reaction, face swelling", "allergic-reaction", "high"),
+        ("Feeling dizzy and about to faint", "fainting", "moderate"),
+        ("Deep cut on arm, blood everywhere", "cuts-wounds", "high"),
+        ("Severe burn from hot oil", "burns", "critical"),
+        ("Can't breathe, something stuck in throat", "choking", "critical"),
+        ("No pulse, unconscious", "cpr", "critical"),
+        ("Sprained wrist, very swollen", "sprains", "moderate"),
+        ("Heavy nosebleed after accident", "nosebleed", "high"),
+        ("Hives all over body, trouble breathing", "allergic-reaction", "critical"),
+        ("Passed out briefly", "fainting", "moderate"),
+        ("Small paper cut", "cuts-wounds", "low"),
+        ("Minor burn from touching hot pan", "burns", "low"),
+        ("Coughing but can still talk", "choking", "low"),
+        ("Person is breathing but unconscious", "cpr", "high"),
+        ("Mild ankle pain", "sprains", "low"),
+        ("Light nosebleed", "nosebleed", "low"),
+        ("Mild skin rash", "allergic-reaction", "low"),
+        ("Feeling lightheaded", "fainting", "low"),
+        # Add more variations
+        ("Bleeding wound on leg", "cuts-wounds", "moderate"),
+        ("Hot water spilled on skin", "burns", "moderate"),
+        ("Food stuck in throat", "choking", "high"),
+        ("Heart stopped beating", "cpr", "critical"),
+        ("Injured knee from fall", "sprains", "moderate"),
+        ("Blood from nose", "nosebleed", "low"),
+        ("Swollen face from allergy", "allergic-reaction", "high"),
+        ("Lost consciousness", "fainting", "high"),
+    ]
+
+def _count_chunk(params, texts):
+    """Sorted terms and term count matrix of one chunk of documents"""
+    counter = CountVectorizer(**params)
+    counts = counter.fit_transform(texts)
+    return counter.get_feature_names_out(), counts
+
+def fit_tfidf(vectorizer, texts, n_jobs=-1):
+    """
+    vectorizer.fit_transform(texts), with tokenizing and counting split
+    across n_jobs processes once the corpus is large enough to pay for it
+    (IDF-weighted vectorizers only; the fitted state is set through the
+    public vocabulary_ and idf_ attributes)
+    
+    Each chunk is counted with the vectorizer's settings (without its
+    document frequency and max_features limits), the chunk vocabularies
+    are merged in sorted order, and the limits and IDF weights are then
+    applied to the combined counts the way TfidfVectorizer.fit does.
+    """
+    n_chunks = effective_n_jobs(n_jobs)
+    if len(texts) < PARALLEL_FIT_MIN_DOCS or n_chunks < 2 or not vectorizer.use_idf:
+        return vectorizer.fit_transform(texts)
+    
+    count_params = CountVectorizer().get_params().keys()
+    params = {name: value for name, value in vectorizer.get_params().items() if name in count_params}
+    params.update(max_df=1.0, min_df=1, max_features=None)
+    
+    bounds = np.linspace(0, len(texts), n_chunks + 1).astype(int)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_count_chunk)(params, texts[start:end])
+        for start, end in zip(bounds[:-1], bounds[1:])
+    )
+    
+    # Chunk terms are sorted, so remapping them into the merged sorted
+    # vocabulary keeps each row's column indices sorted
+    terms = np.unique(np.concatenate([names for names, _ in results]))
+    counts = sp.vstack([
+        sp.csr_matrix(
+            (chunk.data, np.searchsorted(terms, names)[chunk.indices], chunk.indptr),
+            shape=(chunk.shape[0], len(terms)),
+        )
+        for names, chunk in results
+    ], format='csr')
+    
+    # Document frequency and max_features limits, as CountVectorizer applies them
+    n_docs = counts.shape[0]
+    max_df, min_df = vectorizer.max_df, vectorizer.min_df
+    high = max_df if isinstance(max_df, int) else max_df * n_docs
+    low = min_df if isinstance(min_df, int) else min_df * n_docs
+    dfs = np.bincount(counts.indices, minlength=len(terms))
+    mask = (dfs <= high) & (dfs >= low)
+    if vectorizer.max_features is not None and mask.sum() > vectorizer.max_features:
+        tfs = np.asarray(counts.sum(axis=0)).ravel()
+        mask_inds = (-tfs[mask]).argsort()[:vectorizer.max_features]
+        new_mask = np.zeros(len(terms), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+    kept = np.where(mask)[0]
+    if len(kept) == 0:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    counts = counts[:, kept]
+    
+    vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms[kept].tolist())}
+    tfidf = TfidfTransformer(
+        norm=vectorizer.norm,
+        use_idf=vectorizer.use_idf,
+        smooth_idf=vectorizer.smooth_idf,
+        sublinear_tf=vectorizer.sublinear_tf,
+    ).fit(counts)
+    vectorizer.idf_ = tfidf.idf_
+    return tfidf.transform(counts, copy=False)
+
+def _to_float32(clf):
+    """
+    Store a fitted MultinomialNB's log probabilities as float32, which keeps
+    X @ feature_log_prob_.T in float32 (well within 1e-5 of float64 here)
+    and halves the saved weights; the float64 counts are left for updates
+    """
+    clf.feature_log_prob_ = clf.feature_log_prob_.astype(np.float32)
+    clf.class_log_prior_ = clf.class_log_prior_.astype(np.float32)
+
+def save_models(category_pipeline, severity_pipeline):
+    """Write the pickles, ONNX copies and label mappings the server loads"""
+    # Save models uncompressed (compress=0): the server loads them with
+    # mmap_mode='r', which compressed files don't support, and RAM shared
+    # across workers matters more than a few KB on disk
+    joblib.dump(category_pipeline, 'emergency_category_model.pkl', compress=0)
+    joblib.dump(severity_pipeline, 'emergency_severity_model.pkl', compress=0)
+    
+    # ONNX copies for onnxruntime serving, checked against the pipelines on
+    # the training texts; the server only uses them as a pair
+    texts = [row[0] for row in load_training_data()]
+    exported = all([
+        export_onnx_pipeline(category_pipeline, 'emergency_category_model.onnx', texts),
+        export_onnx_pipeline(severity_pipeline, 'emergency_severity_model.onnx', texts),
+    ])
+    if not exported:
+        for path in ('emergency_category_model.onnx', 'emergency_severity_model.onnx'):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    # Save label mappings in the classifiers' class order (sorted, like
+    # np.unique), so list positions are the probability columns
+    with open('model_config.json', 'w') as f:
+        json.dump({
+            'categories': category_pipeline.named_steps['classifier'].classes_.tolist(),
+            'severities': severity_pipeline.named_steps['classifier'].classes_.tolist(),
+            'dtype': 'float32'
+        }, f)
 
 def train_emergency_classifier():
     """Train a simple emergency classifier"""
     
-    # Prepare data
-    texts = [item[0] for item in training_data]
-    categories = [item[1] for item in training_data]
-    severities = [item[2] for item in training_data]
+    # Prepare data (one pass over the rows, as string arrays)
+    texts, categories, severities = (np.array(column) for column in zip(*load_training_data()))
     
-    # Split data
-    X_train, X_test, y_cat_train, y_cat_test, y_sev_train, y_sev_test = train_test_split(
-        texts, categories, severities, test_size=0.2, random_state=42
-    )
+    # Split data (seeded shuffle, 80/20)
+    order = np.random.default_rng(42).permutation(len(texts))
+    split = int(0.8 * len(order))
+    train_idx, test_idx = order[:split], order[split:]
+    X_train, X_test = texts[train_idx], texts[test_idx]
+    y_cat_train, y_cat_test = categories[train_idx], categories[test_idx]
+    y_sev_train, y_sev_test = severities[train_idx], severities[test_idx]
+    
+    # Vectorize once; both classifiers are fitted on the same TF-IDF matrix
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', dtype=np.float32)
+    X_train_vec = fit_tfidf(vectorizer, X_train)
+    X_test_vec = vectorizer.transform(X_test)
     
-    # Train category classifier
+    # partial_fit with every label declared up front: same model as fit(),
+    # but later rows can be added by update_emergency_classifier, and
+    # labels missing from the training split still get a class column
+    cat_clf = MultinomialNB().partial_fit(X_train_vec, y_cat_train, classes=np.unique(categories))
+    sev_clf = MultinomialNB().partial_fit(X_train_vec, y_sev_train, classes=np.unique(severities))
+    for clf in (cat_clf, sev_clf):
+        _to_float32(clf)
+    
+    # Pipelines over the already fitted steps keep the interface the
+    # server, quantization and ONNX export expect
     category_pipeline = Pipeline([
-        ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
-        ('classifier', MultinomialNB())
+        ('tfidf', vectorizer),
+        ('classifier', cat_clf)
     ])
-    category_pipeline.fit(X_train, y_cat_train)
-    
-    # Train severity classifier
     severity_pipeline = Pipeline([
-        ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
-        ('classifier', MultinomialNB())
+        ('tfidf', vectorizer),
+        ('classifier', sev_clf)
     ])
-    severity_pipeline.fit(X_train, y_sev_train)
     
     # Evaluate
-    cat_pred = category_pipeline.predict(X_test)
-    sev_pred = severity_pipeline.predict(X_test)
+    cat_pred = cat_clf.predict(X_test_vec)
+    sev_pred = sev_clf.predict(X_test_vec)
     
     print("Category Classification Report:")
     print(classification_report(y_cat_test, cat_pred))
@@ -87,46 +219,149 @@ def train_emergency_classifier():
     print("\nSeverity Classification Report:")
     print(classification_report(y_sev_test, sev_pred))
     
-    # Save models
-    joblib.dump(category_pipeline, 'emergency_category_model.pkl')
-    joblib.dump(severity_pipeline, 'emergency_severity_model.pkl')
+    save_models(category_pipeline, severity_pipeline)
     
-    # Save label mappings
-    categories_unique = list(set(categories))
-    severities_unique = list(set(severities))
+    print("\nModels saved successfully!")
+    return category_pipeline, severity_pipeline
+
+def update_emergency_classifier(rows):
+    """
+    Add (text, category, severity) rows to the saved models without
+    retraining from scratch
     
-    with open('model_config.json', 'w') as f:
-        json.dump({
-            'categories': categories_unique,
-            'severities': severities_unique
-        }, f)
+    The vocabulary and IDF weights stay fixed, so words the vectorizer
+    has never seen are ignored, and every label must already be known;
+    add new labels to load_training_data and retrain instead.
+    """
+    category_pipeline = joblib.load('emergency_category_model.pkl')
+    severity_pipeline = joblib.load('emergency_severity_model.pkl')
     
-    print("\nModels saved successfully!")
+    texts, categories, severities = (np.array(column) for column in zip(*rows))
+    X = category_pipeline.named_steps['tfidf'].transform(texts)
+    for pipeline, labels in ((category_pipeline, categories), (severity_pipeline, severities)):
+        clf = pipeline.named_steps['classifier']
+        clf.partial_fit(X, labels)
+        _to_float32(clf)
+    
+    save_models(category_pipeline, severity_pipeline)
+    print(f"Models updated with {len(texts)} rows")
     return category_pipeline, severity_pipeline
 
-def predict_emergency(text, category_model, severity_model):
-    """Predict emergency category and severity"""
-    category = category_model.predict([text])[0]
-    severity = severity_model.predict([text])[0]
+class EmergencyPredictor:
+    """
+    Category and severity prediction from the trained pipelines, with the
+    naive Bayes weights pulled out of them once instead of on every call
+    """
+    
+    def __init__(self, category_model, severity_model):
+        # The pipelines share one fitted vectorizer
+        self.features = TfidfFeatures(category_model.named_steps['tfidf'])
+        cat_clf = category_model.named_steps['classifier']
+        sev_clf = severity_model.named_steps['classifier']
+        
+        # Features x classes, so X @ weights needs no transpose per call
+        self.cat_weights = np.ascontiguousarray(cat_clf.feature_log_prob_.T)
+        self.cat_prior = cat_clf.class_log_prior_
+        # Labels as Python strings, looked up by class index
+        self.cat_classes = cat_clf.classes_.tolist()
+        self.sev_weights = np.ascontiguousarray(sev_clf.feature_log_prob_.T)
+        self.sev_prior = sev_clf.class_log_prior_
+        self.sev_classes = sev_clf.classes_.tolist()
+    
+    @staticmethod
+    def _best(jll):
+        """
+        Most likely class and its probability from joint log likelihoods
+        (last axis); the winner's softmax probability is
+        1 / sum(exp(jll - max)), so the full probability vector is skipped
+        """
+        best = jll.argmax(axis=-1)
+        top = np.take_along_axis(jll, np.expand_dims(best, -1), axis=-1)
+        confidence = 1.0 / np.exp(jll - top).sum(axis=-1)
+        return best, confidence
     
-    # Get confidence scores
-    cat_proba = category_model.predict_proba([text])[0]
-    sev_proba = severity_model.predict_proba([text])[0]
+    def predict_one(self, text):
+        """
+        Predict emergency category and severity for one text, with the
+        class scores summed over its few nonzero TF-IDF columns directly
+        """
+        indices, values = self.features.transform_one(text)
+        cat_idx, cat_confidence = self._best(values @ self.cat_weights[indices] + self.cat_prior)
+        sev_idx, sev_confidence = self._best(values @ self.sev_weights[indices] + self.sev_prior)
+        
+        cat_confidence = float(cat_confidence)
+        sev_confidence = float(sev_confidence)
+        return {
+            'category': self.cat_classes[int(cat_idx)],
+            'severity': self.sev_classes[int(sev_idx)],
+            'category_confidence': cat_confidence,
+            'severity_confidence': sev_confidence,
+            'overall_confidence': (cat_confidence + sev_confidence) / 2
+        }
     
-    cat_confidence = max(cat_proba)
-    sev_confidence = max(sev_proba)
+    def predict(self, texts):
+        """Predict emergency category and severity for a list of texts"""
+        X = self.features.transform(texts)
+        
+        # The argmax of the probabilities is what predict() returns
+        cat_idx, cat_confidences = self._best(np.asarray(X @ self.cat_weights) + self.cat_prior)
+        sev_idx, sev_confidences = self._best(np.asarray(X @ self.sev_weights) + self.sev_prior)
+        
+        # Class indices stay integers until the result dicts are built
+        return [
+            {
+                'category': self.cat_classes[category],
+                'severity': self.sev_classes[severity],
+                'category_confidence': float(cat_confidence),
+                'severity_confidence': float(sev_confidence),
+                'overall_confidence': float((cat_confidence + sev_confidence) / 2)
+            }
+            for category, severity, cat_confidence, sev_confidence in zip(
+                cat_idx.tolist(), sev_idx.tolist(), cat_confidences.tolist(), sev_confidences.tolist()
+            )
+        ]
+
+# Predictors by (id(category_model), id(severity_model)), holding the models
+# too so their ids can't be reused while cached
+_predictors = {}
+
+def get_predictor(category_model, severity_model):
+    """
+    EmergencyPredictor for a model pair, built on first use and reused after
     
-    return {
-        'category': category,
-        'severity': severity,
-        'category_confidence': float(cat_confidence),
-        'severity_confidence': float(sev_confidence),
-        'overall_confidence': float((cat_confidence + sev_confidence) / 2)
-    }
+    Models refit in place (partial_fit) keep their ids, so build a new
+    EmergencyPredictor for those instead.
+    """
+    key = (id(category_model), id(severity_model))
+    entry = _predictors.get(key)
+    if entry is None:
+        entry = (category_model, severity_model, EmergencyPredictor(category_model, severity_model))
+        _predictors[key] = entry
+    return entry[2]
+
+def predict_emergencies(texts, category_model, severity_model):
+    """Predict emergency category and severity for a list of texts"""
+    return get_predictor(category_model, severity_model).predict(texts)
+
+def predict_emergency(text, category_model, severity_model):
+    """Predict emergency category and severity"""
+    return get_predictor(category_model, severity_model).predict_one(text)
 
 if __name__ == "__main__":
-    # Train models
-    cat_model, sev_model = train_emergency_classifier()
+    parser = argparse.ArgumentParser(description="Train the emergency classifiers")
+    parser.add_argument(
+        "--update",
+        metavar="ROWS_JSON",
+        help="add a JSON list of [text, category, severity] rows to the saved models instead of retraining",
+    )
+    args = parser.parse_args()
+    
+    if args.update:
+        with open(args.update) as f:
+            cat_model, sev_model = update_emergency_classifier(json.load(f))
+    else:
+        # Train models
+        cat_model, sev_model = train_emergency_classifier()
     
     # Test predictions
     test_cases = [
@@ -136,8 +371,8 @@ if __name__ == "__main__":
     ]
     
     print("\nTest Predictions:")
-    for test in test_cases:
-        result = predict_emergency(test, cat_model, sev_model)
+    results = predict_emergencies(test_cases, cat_model, sev_model)
+    for test, result in zip(test_cases, results):
         print(f"Text: {test}")
         print(f"Prediction: {result}")
         print()
\ No newline at end of file